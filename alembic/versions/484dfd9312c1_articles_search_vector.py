@@ -0,0 +1,41 @@
+"""articles search vector
+
+Revision ID: 484dfd9312c1
+Revises: 6c86e6ea57fa
+Create Date: 2026-10-18 22:07:41.502391
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "484dfd9312c1"
+down_revision = "6c86e6ea57fa"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "articles",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', title), 'A') || "
+                "setweight(to_tsvector('english', description), 'B') || "
+                "setweight(to_tsvector('english', body), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_articles_search_vector", "articles", ["search_vector"], unique=False, postgresql_using="gin")
+
+
+def downgrade():
+    op.drop_index("ix_articles_search_vector", table_name="articles", postgresql_using="gin")
+    op.drop_column("articles", "search_vector")
@@ -0,0 +1,23 @@
+"""comments article id index
+
+Revision ID: 5e2a91c4d7b3
+Revises: b1f0d8c3a27e
+Create Date: 2026-10-19 09:41:27.503118
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2a91c4d7b3"
+down_revision = "b1f0d8c3a27e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_comments_article_id_id", "comments", ["article_id", "id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_comments_article_id_id", table_name="comments")
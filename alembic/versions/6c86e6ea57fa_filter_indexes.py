@@ -0,0 +1,48 @@
+"""filter indexes
+
+Revision ID: 6c86e6ea57fa
+Revises: ec713ca6f0cb
+Create Date: 2026-10-18 21:52:04.118263
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6c86e6ea57fa"
+down_revision = "ec713ca6f0cb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_users_name_trgm",
+        "users",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_tags_name_trgm",
+        "tags",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(op.f("ix_users_name"), "users", ["name"], unique=False)
+    op.create_index(op.f("ix_articles_author_id"), "articles", ["author_id"], unique=False)
+    op.create_index("ix_article_tag_tag_id", "article_tag", ["tag_id"], unique=False)
+    op.create_index("ix_article_favorite_user_id", "article_favorite", ["user_id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_article_favorite_user_id", table_name="article_favorite")
+    op.drop_index("ix_article_tag_tag_id", table_name="article_tag")
+    op.drop_index(op.f("ix_articles_author_id"), table_name="articles")
+    op.drop_index(op.f("ix_users_name"), table_name="users")
+    op.drop_index("ix_tags_name_trgm", table_name="tags", postgresql_using="gin")
+    op.drop_index("ix_users_name_trgm", table_name="users", postgresql_using="gin")
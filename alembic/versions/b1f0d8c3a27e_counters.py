@@ -0,0 +1,42 @@
+"""counters
+
+Revision ID: b1f0d8c3a27e
+Revises: 484dfd9312c1
+Create Date: 2026-10-18 23:12:05.318204
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b1f0d8c3a27e"
+down_revision = "484dfd9312c1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("articles", sa.Column("favorites_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("articles", sa.Column("comments_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("users", sa.Column("followers_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("users", sa.Column("following_count", sa.Integer(), server_default="0", nullable=False))
+
+    op.execute(
+        "UPDATE articles SET "
+        "favorites_count = (SELECT count(*) FROM article_favorite WHERE article_id = articles.id), "
+        "comments_count = (SELECT count(*) FROM comments WHERE article_id = articles.id)"
+    )
+    op.execute(
+        "UPDATE users SET "
+        "followers_count = (SELECT count(*) FROM follower_user WHERE following_id = users.id), "
+        "following_count = (SELECT count(*) FROM follower_user WHERE follower_id = users.id)"
+    )
+
+
+def downgrade():
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "followers_count")
+    op.drop_column("articles", "comments_count")
+    op.drop_column("articles", "favorites_count")
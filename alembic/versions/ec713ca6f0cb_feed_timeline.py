@@ -0,0 +1,47 @@
+"""feed timeline
+
+Revision ID: ec713ca6f0cb
+Revises: 29b2b20b29d7
+Create Date: 2026-10-18 21:15:37.755900
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "ec713ca6f0cb"
+down_revision = "29b2b20b29d7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("fanout_on_read", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.create_index("ix_follower_user_following_id", "follower_user", ["following_id"], unique=False)
+    op.create_table(
+        "feed_timeline",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("article_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "article_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO feed_timeline (user_id, article_id)
+        SELECT follower_user.follower_id, articles.id
+        FROM articles JOIN follower_user ON follower_user.following_id = articles.author_id
+        """
+    )
+    op.create_index("ix_feed_timeline_article_id", "feed_timeline", ["article_id"], unique=False)
+
+
+def downgrade():
+    op.drop_table("feed_timeline")
+    op.drop_index("ix_follower_user_following_id", table_name="follower_user")
+    op.drop_column("users", "fanout_on_read")
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import articles, auth, comments, favorites, profiles, tags, user
+from app.api.routes import articles, auth, comments, favorites, internal, profiles, tags, user
 
 router = APIRouter()
 
@@ -35,3 +35,4 @@ router.include_router(
     prefix="/user",
     tags=["User and Authentication"],
 )
+router.include_router(internal.router, prefix="/internal")
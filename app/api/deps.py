@@ -1,13 +1,18 @@
+import time
 from collections.abc import AsyncGenerator
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import APIKeyHeader
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
+from app.core.cache import identity_cache, token_cache
+from app.core.config import settings
+from app.core.middleware import MIN_LSN_COOKIE
 from app.crud.crud_article import ArticlesRepository
 from app.crud.crud_comment import CommentsRepository
 from app.crud.crud_user import UsersRepository
@@ -15,23 +20,37 @@ from app.db.session import SessionLocal, SessionLocalRo
 from app.models.user import User
 
 
-async def _get_db() -> AsyncGenerator:
+async def _get_db(request: Request) -> AsyncGenerator:
     db = SessionLocal()
     try:
         yield db
+        if settings.READ_YOUR_WRITES and db.info.get("committed"):
+            # Past the commits of the request, for its client to read them back once replicas replayed it
+            request.state.write_lsn = int(await db.scalar(text("SELECT pg_current_wal_lsn() - '0/0'")))
     finally:
         await db.close()
 
 
-async def _get_db_ro() -> AsyncGenerator:
-    db = SessionLocalRo()
+def get_min_lsn(request: Request) -> int | None:
+    if not settings.READ_YOUR_WRITES:
+        return None
+    return security.verify_lsn(request.cookies.get(MIN_LSN_COOKIE, ""))
+
+
+async def _get_db_ro(request: Request) -> AsyncGenerator:
+    min_lsn = get_min_lsn(request)
+    db = SessionLocalRo(info={"min_lsn": min_lsn} if min_lsn is not None else None)
     try:
         yield db
     finally:
         await db.close()
 
 
-async def _get_current_user_from_token(token: str, users: UsersRepository) -> User:
+def _get_token_payload(token: str) -> dict[str, Any]:
+    payload = token_cache.get(token) if settings.IDENTITY_CACHE else None
+    if payload is not None and payload["exp"] > time.time():
+        return payload
+
     try:
         payload = security.decode_access_token(token)
     except jwt.JWTError, ValidationError:
@@ -39,9 +58,27 @@ async def _get_current_user_from_token(token: str, users: UsersRepository) -> Us
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = await users.get(id=int(payload["sub"]))
+
+    if settings.IDENTITY_CACHE:
+        token_cache.set(token, payload)
+    return payload
+
+
+async def _get_current_user_from_payload(payload: dict[str, Any], users: UsersRepository) -> User:
+    user_id = int(payload["sub"])
+
+    user = identity_cache.get(user_id) if settings.IDENTITY_CACHE else None
+    if user is not None:
+        return user
+
+    user = await users.get(id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+
+    if settings.IDENTITY_CACHE:
+        # Shared by later requests, detached so that it never lazy loads through a closed session
+        users.dbro.expunge(user)
+        identity_cache.set(user_id, user)
     return user
 
 
@@ -68,8 +105,10 @@ def _get_optional_authorization_header(request: Request) -> str:
     return ""
 
 
-SessionDatabase = Annotated[AsyncSession, Depends(_get_db)]
-SessionDatabaseRo = Annotated[AsyncSession, Depends(_get_db_ro)]
+# Sessions only check out a pooled connection on their first statement, so that reads never hold one
+# of the primary, and give it back as soon as the endpoint returns rather than once the response is sent
+SessionDatabase = Annotated[AsyncSession, Depends(_get_db, scope="function")]
+SessionDatabaseRo = Annotated[AsyncSession, Depends(_get_db_ro, scope="function")]
 
 
 def get_users_service(db: SessionDatabase, dbro: SessionDatabaseRo) -> UsersRepository:
@@ -84,22 +123,33 @@ def get_articles_service(db: SessionDatabase, dbro: SessionDatabaseRo) -> Articl
     return ArticlesRepository(db=db, dbro=dbro)
 
 
+def _get_current_token_payload(token: Annotated[str, Depends(_get_authorization_header)]) -> dict[str, Any]:
+    return _get_token_payload(token)
+
+
 async def _get_current_user(
-    token: Annotated[str, Depends(_get_authorization_header)],
+    payload: Annotated[dict[str, Any], Depends(_get_current_token_payload)],
     users: Annotated[UsersRepository, Depends(get_users_service)],
 ) -> User:
-    return await _get_current_user_from_token(token, users)
+    return await _get_current_user_from_payload(payload, users)
 
 
 async def _get_optional_current_user(
     token: Annotated[str, Depends(_get_optional_authorization_header)],
     users: Annotated[UsersRepository, Depends(get_users_service)],
 ) -> User | None:
-    if token:
-        return await _get_current_user_from_token(token, users)
+    if not token:
+        return None
+
+    payload = _get_token_payload(token)
+    if "username" in payload:
+        # Read endpoints only need who is reading, as given by the embedded claims
+        return User(id=int(payload["sub"]), name=payload["username"])
 
-    return None
+    return await _get_current_user_from_payload(payload, users)
 
 
 CurrentUser = Annotated[User, Depends(_get_current_user)]
+CurrentToken = Annotated[str, Depends(_get_authorization_header)]
+CurrentTokenPayload = Annotated[dict[str, Any], Depends(_get_current_token_payload)]
 OptionalCurrentUser = Annotated[User, Depends(_get_optional_current_user)]
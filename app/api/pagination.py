@@ -0,0 +1,25 @@
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def get_cursor(cursor: str | None, *types: type | tuple[type, ...]) -> list[Any] | None:
+    if cursor is None:
+        return None
+    try:
+        keys = decode_cursor(cursor, len(types))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # JSON booleans decode to bool, a subclass of int that Postgres refuses to compare with integers
+    if not all(isinstance(key, type_) and not isinstance(key, bool) for key, type_ in zip(keys, types, strict=True)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return keys
+
+
+def get_next_cursor(result: Sequence[Any], limit: int, *keys: str) -> str | None:
+    if not result or len(result) < limit:
+        return None
+    return encode_cursor(*[getattr(result[-1], key) for key in keys])
@@ -0,0 +1,17 @@
+from typing import Any
+
+import pydantic_core
+from fastapi import Response
+from pydantic import BaseModel
+
+
+# Responses built from trusted database data, written straight to JSON bytes by pydantic-core,
+# skipping the validation and encoding of response_model which is only kept for the documentation
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes | memoryview:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+
+        return pydantic_core.to_json(content)
@@ -1,16 +1,20 @@
-from typing import Annotated
+from collections.abc import Sequence
+from typing import Annotated, Any, NoReturn
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from slugify import slugify
+from sqlalchemy import Row
 
 from app.api.deps import (
     CurrentUser,
     OptionalCurrentUser,
     get_articles_service,
 )
+from app.api.pagination import get_cursor, get_next_cursor
+from app.api.responses import FastJSONResponse
 from app.crud.crud_article import ArticlesRepository
 from app.models.article import Article
 from app.schemas.articles import (
+    ARTICLE_FIELDS,
     MultipleArticlesResponse,
     NewArticleRequest,
     SingleArticleResponse,
@@ -32,6 +36,35 @@ async def _get_article_from_slug(
     return db_article
 
 
+async def _raise_not_author(slug: str, articles: ArticlesRepository) -> NoReturn:
+    # Writes only match articles of the current user, tell why nothing was written
+    await _get_article_from_slug(slug, articles)
+    raise HTTPException(status_code=400, detail="You are not the author of this article")
+
+
+def _get_fields(fields: str | None) -> set[str] | None:
+    if fields is None:
+        return None
+
+    try:
+        # The slug identifies returned articles, so it is always part of the fieldset
+        return {ARTICLE_FIELDS[field.strip()] for field in fields.split(",") if field.strip()} | {"slug"}
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Invalid fields") from None
+
+
+def _articles_response(
+    result: Sequence[Row[Any]], count: int | None, next_cursor: str | None, fields: set[str] | None
+) -> FastJSONResponse:
+    return FastJSONResponse(
+        {
+            "articles": [Article.row_json(row, fields) for row in result],
+            "articlesCount": count,
+            "nextCursor": next_cursor,
+        }
+    )
+
+
 @router.get(
     "",
     operation_id="GetArticles",
@@ -44,21 +77,33 @@ async def get_list(
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
     limit: Annotated[int, Query(title="Limit number of articles returned (default is 20)")] = max_limit,
     offset: Annotated[int, Query(title="Offset/skip number of articles (default is 0)")] = 0,
+    cursor: Annotated[
+        str | None, Query(title="Cursor of next page as returned by nextCursor, takes precedence over offset")
+    ] = None,
     author: Annotated[str | None, Query(title="Filter by author (username)")] = None,
     tag: Annotated[str | None, Query(title="Filter by tag")] = None,
     favorited: Annotated[str | None, Query(title="Filter by favorites of a user (username)")] = None,
-) -> MultipleArticlesResponse:
+    exact: Annotated[
+        bool | None, Query(title="Match author, tag and favorited exactly instead of partially (default from settings)")
+    ] = None,
+    fields: Annotated[
+        str | None, Query(title="Comma separated article fields to return, e.g. slug,title,description,tagList")
+    ] = None,
+) -> FastJSONResponse:
+    limit = min(limit, max_limit)
+    article_fields = _get_fields(fields)
     result, count = await articles.get_list(
-        min(limit, max_limit),
+        limit,
         offset,
+        user=current_user,
+        cursor=get_cursor(cursor, int),
         author=author,
         favorited=favorited,
         tag=tag,
+        exact=exact,
+        fields=article_fields,
     )
-    return MultipleArticlesResponse(
-        articles=[article.schema(current_user) for article in result],
-        articles_count=count,
-    )
+    return _articles_response(result, count, get_next_cursor(result, limit, "id"), article_fields)
 
 
 @router.get(
@@ -73,12 +118,52 @@ async def get_feed(
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
     limit: Annotated[int, Query(title="Limit number of articles returned (default is 20)")] = 20,
     offset: Annotated[int, Query(title="Offset/skip number of articles (default is 0)")] = 0,
-) -> MultipleArticlesResponse:
-    result, count = await articles.get_feed(min(limit, max_limit), offset, user=current_user)
-    return MultipleArticlesResponse(
-        articles=[article.schema(current_user) for article in result],
-        articles_count=count,
+    cursor: Annotated[
+        str | None, Query(title="Cursor of next page as returned by nextCursor, takes precedence over offset")
+    ] = None,
+    fields: Annotated[
+        str | None, Query(title="Comma separated article fields to return, e.g. slug,title,description,tagList")
+    ] = None,
+) -> FastJSONResponse:
+    limit = min(limit, max_limit)
+    article_fields = _get_fields(fields)
+    result, count = await articles.get_feed(
+        limit, offset, user=current_user, cursor=get_cursor(cursor, int), fields=article_fields
+    )
+    return _articles_response(result, count, get_next_cursor(result, limit, "id"), article_fields)
+
+
+@router.get(
+    "/search",
+    operation_id="SearchArticles",
+    summary="Search articles",
+    description="Search articles by title, description and body, most relevant first. Auth is optional",
+    response_model=MultipleArticlesResponse,
+)
+async def search(
+    current_user: OptionalCurrentUser,
+    articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
+    q: Annotated[str, Query(title="Search terms, in web search syntax", min_length=1)],
+    limit: Annotated[int, Query(title="Limit number of articles returned (default is 20)")] = max_limit,
+    offset: Annotated[int, Query(title="Offset/skip number of articles (default is 0)")] = 0,
+    cursor: Annotated[
+        str | None, Query(title="Cursor of next page as returned by nextCursor, takes precedence over offset")
+    ] = None,
+    fields: Annotated[
+        str | None, Query(title="Comma separated article fields to return, e.g. slug,title,description,tagList")
+    ] = None,
+) -> FastJSONResponse:
+    limit = min(limit, max_limit)
+    article_fields = _get_fields(fields)
+    result, count = await articles.search(
+        limit,
+        offset,
+        query=q,
+        user=current_user,
+        cursor=get_cursor(cursor, (float, int), int),
+        fields=article_fields,
     )
+    return _articles_response(result, count, get_next_cursor(result, limit, "rank", "id"), article_fields)
 
 
 @router.post(
@@ -92,13 +177,11 @@ async def create(
     current_user: CurrentUser,
     new_article: NewArticleRequest,
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
-) -> SingleArticleResponse:
-    existing_article = await articles.get_by_slug(slug=slugify(new_article.article.title))
-    if existing_article:
-        raise HTTPException(status_code=400, detail="Article with this title already exists")
-
+) -> FastJSONResponse:
     article = await articles.create(obj_in=new_article.article, author=current_user)
-    return SingleArticleResponse(article=article.schema(current_user))
+    if not article:
+        raise HTTPException(status_code=400, detail="Article with this title already exists")
+    return FastJSONResponse({"article": Article.row_json(article)})
 
 
 @router.get(
@@ -112,9 +195,11 @@ async def get(
     current_user: OptionalCurrentUser,
     slug: Annotated[str, Path(title="Slug of the article to get")],
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
-) -> SingleArticleResponse:
-    article = await _get_article_from_slug(slug, articles)
-    return SingleArticleResponse(article=article.schema(current_user))
+) -> FastJSONResponse:
+    article = await articles.get_row_by_slug(slug=slug, user=current_user)
+    if not article:
+        raise HTTPException(status_code=404, detail="No article found")
+    return FastJSONResponse({"article": Article.row_json(article)})
 
 
 @router.put(
@@ -129,13 +214,11 @@ async def update(
     slug: Annotated[str, Path(title="Slug of the article to update")],
     update_article: UpdateArticleRequest,
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
-) -> SingleArticleResponse:
-    article = await _get_article_from_slug(slug, articles)
-
-    if article.author != current_user:
-        raise HTTPException(status_code=400, detail="You are not the author of this article")
-    article = await articles.update(db_obj=article, obj_in=update_article.article)
-    return SingleArticleResponse(article=article.schema(current_user))
+) -> FastJSONResponse:
+    article = await articles.update(slug=slug, obj_in=update_article.article, user=current_user)
+    if not article:
+        await _raise_not_author(slug, articles)
+    return FastJSONResponse({"article": Article.row_json(article)})
 
 
 @router.delete(
@@ -149,8 +232,5 @@ async def delete(
     slug: Annotated[str, Path(title="Slug of the article to delete")],
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
 ) -> None:
-    article = await _get_article_from_slug(slug, articles)
-
-    if article.author != current_user:
-        raise HTTPException(status_code=400, detail="You are not the author of this article")
-    await articles.delete(db_obj=article)
+    if not await articles.delete(slug=slug, user=current_user):
+        await _raise_not_author(slug, articles)
@@ -20,11 +20,9 @@ async def register(
     new_user: NewUserRequest,
     users: Annotated[UsersRepository, Depends(get_users_service)],
 ) -> UserResponse:
-    db_user = await users.get_by_email(email=new_user.user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
     db_user = await users.create(obj_in=new_user.user)
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return UserResponse(user=db_user.schema())
 
 
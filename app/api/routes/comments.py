@@ -1,15 +1,19 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 
 from app.api.deps import (
     CurrentUser,
     OptionalCurrentUser,
     get_articles_service,
     get_comments_service,
+    get_users_service,
 )
+from app.api.pagination import get_cursor, get_next_cursor
+from app.api.responses import FastJSONResponse
 from app.crud.crud_article import ArticlesRepository
 from app.crud.crud_comment import CommentsRepository
+from app.crud.crud_user import UsersRepository
 from app.models.article import Article
 from app.models.comment import Comment
 from app.schemas.comments import (
@@ -20,6 +24,8 @@ from app.schemas.comments import (
 
 router = APIRouter()
 
+max_limit: int = 100
+
 
 async def _get_article_from_slug(
     slug: str,
@@ -53,10 +59,32 @@ async def get_list(
     slug: Annotated[str, Path(title="Slug of the article that you want to get comments for")],
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
     comments: Annotated[CommentsRepository, Depends(get_comments_service)],
-) -> MultipleCommentsResponse:
+    users: Annotated[UsersRepository, Depends(get_users_service)],
+    limit: Annotated[
+        int | None,
+        Query(ge=1, title="Limit number of comments returned (default is all comments, at most 100 per page)"),
+    ] = None,
+    cursor: Annotated[str | None, Query(title="Cursor of next page as returned by nextCursor")] = None,
+) -> FastJSONResponse:
     article = await _get_article_from_slug(slug, articles)
-    return MultipleCommentsResponse(
-        comments=[comment.schema(current_user) for comment in await comments.get_list(article=article)]
+    keys = get_cursor(cursor, int)
+
+    # Without limit nor cursor, all comments are returned as the spec expects
+    if limit is not None or keys is not None:
+        limit = min(limit or max_limit, max_limit)
+
+    result = await comments.get_list(article, limit=limit, cursor=keys[0] if keys else None)
+
+    # Follow state of all distinct authors of the page in one query
+    followed: set[int] = set()
+    if current_user:
+        followed = await users.get_followed_ids(follower=current_user, ids={comment.author_id for comment in result})
+
+    return FastJSONResponse(
+        MultipleCommentsResponse(
+            comments=[comment.schema(comment.author_id in followed) for comment in result],
+            next_cursor=get_next_cursor(result, limit, "id") if limit else None,
+        )
     )
 
 
@@ -71,12 +99,13 @@ async def create(
     current_user: CurrentUser,
     slug: Annotated[str, Path(title="Slug of the article that you want to create a comment for")],
     new_comment: NewCommentRequest,
-    articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
     comments: Annotated[CommentsRepository, Depends(get_comments_service)],
-) -> SingleCommentResponse:
-    article = await _get_article_from_slug(slug, articles)
-    comment = await comments.create(obj_in=new_comment.comment, article=article, author=current_user)
-    return SingleCommentResponse(comment=comment.schema(current_user))
+) -> FastJSONResponse:
+    comment = await comments.create(obj_in=new_comment.comment, slug=slug, author=current_user)
+    if not comment:
+        raise HTTPException(status_code=404, detail="No article found")
+    # Written by the current user, whose profile is never seen as followed by themselves
+    return FastJSONResponse(SingleCommentResponse(comment=comment.schema()))
 
 
 @router.delete(
@@ -92,13 +121,14 @@ async def delete(
     articles: Annotated[ArticlesRepository, Depends(get_articles_service)],
     comments: Annotated[CommentsRepository, Depends(get_comments_service)],
 ) -> None:
+    if await comments.delete(id=comment_id, slug=slug, user=current_user):
+        return
+
+    # Nothing was deleted, tell why
     article = await _get_article_from_slug(slug, articles)
     comment = await _get_comment_from_id(comment_id, comments)
 
     if comment.article != article:
         raise HTTPException(status_code=400, detail="Comment does not belong to this article")
 
-    if comment.author != current_user and article.author != current_user:
-        raise HTTPException(status_code=400, detail="Comment does not belong to this user")
-
-    await comments.delete(db_obj=comment)
+    raise HTTPException(status_code=400, detail="Comment does not belong to this user")
@@ -0,0 +1,22 @@
+from typing import Any, cast
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.config import settings
+from app.core.security import password_pool
+from app.db.pool import MeasuredQueuePool
+from app.db.session import engine, replicas
+
+router = APIRouter()
+
+
+@router.get("/stats", include_in_schema=False)
+async def get_stats() -> dict[str, Any]:
+    # Not authenticated, only to be enabled where the API is not exposed publicly
+    if not settings.INTERNAL_STATS:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return {
+        "pools": {"primary": cast(MeasuredQueuePool, engine.pool).stats(), "replicas": replicas.stats()},
+        "password_hash": password_pool.stats(),
+    }
@@ -7,8 +7,10 @@ from app.api.deps import (
     OptionalCurrentUser,
     get_users_service,
 )
+from app.api.responses import FastJSONResponse
 from app.crud.crud_user import UsersRepository
 from app.models.user import User
+from app.schemas.profiles import Profile as ProfileDto
 from app.schemas.profiles import ProfileResponse
 
 router = APIRouter()
@@ -35,9 +37,9 @@ async def get(
     current_user: OptionalCurrentUser,
     username: Annotated[str, Path(description="Username of the profile to get")],
     users: Annotated[UsersRepository, Depends(get_users_service)],
-) -> ProfileResponse:
+) -> FastJSONResponse:
     user = await _get_profile_from_username(username, users)
-    return ProfileResponse(profile=user.profile(current_user))
+    return FastJSONResponse(ProfileResponse(profile=user.profile(current_user)))
 
 
 @router.post(
@@ -51,10 +53,13 @@ async def follow(
     current_user: CurrentUser,
     username: Annotated[str, Path(description="Username of the profile you want to follow")],
     users: Annotated[UsersRepository, Depends(get_users_service)],
-) -> ProfileResponse:
-    user = await _get_profile_from_username(username, users)
-    await users.follow(db_obj=user, follower=current_user)
-    return ProfileResponse(profile=user.profile(current_user))
+) -> FastJSONResponse:
+    user = await users.follow(name=username, follower=current_user)
+    if not user:
+        raise HTTPException(status_code=404, detail="No user found")
+    return FastJSONResponse(
+        ProfileResponse(profile=ProfileDto(username=user.name, bio=user.bio, image=user.image, following=True))
+    )
 
 
 @router.delete(
@@ -68,7 +73,10 @@ async def unfollow(
     current_user: CurrentUser,
     username: Annotated[str, Path(description="Username of the profile you want to unfollow")],
     users: Annotated[UsersRepository, Depends(get_users_service)],
-) -> ProfileResponse:
-    user = await _get_profile_from_username(username, users)
-    await users.follow(db_obj=user, follower=current_user, follow=False)
-    return ProfileResponse(profile=user.profile(current_user))
+) -> FastJSONResponse:
+    user = await users.follow(name=username, follower=current_user, follow=False)
+    if not user:
+        raise HTTPException(status_code=404, detail="No user found")
+    return FastJSONResponse(
+        ProfileResponse(profile=ProfileDto(username=user.name, bio=user.bio, image=user.image, following=False))
+    )
@@ -1,13 +1,45 @@
-from fastapi import APIRouter
+import hashlib
+
+from fastapi import APIRouter, Request, Response, status
 from sqlalchemy import select
 
-from app.db.session import SessionLocalRo
+from app.api.deps import get_min_lsn
+from app.core.cache import EncodedBody, tags_cache
+from app.core.config import settings
+from app.db.session import SessionLocal, SessionLocalRo
 from app.models.tag import Tag
 from app.schemas.tags import TagsResponse
 
 router = APIRouter()
 
 
+async def _get_snapshot(request: Request) -> EncodedBody:
+    if settings.TAGS_CACHE:
+        snapshot = tags_cache.get()
+        if snapshot is not None:
+            return snapshot
+
+    version = tags_cache.version
+
+    # A replica lagging behind the new tag would leave a stale snapshot for the whole TTL,
+    # the first reload after an invalidation reads from the primary
+    if settings.TAGS_CACHE and tags_cache.invalidated:
+        session = SessionLocal()
+    else:
+        min_lsn = get_min_lsn(request)
+        session = SessionLocalRo(info={"min_lsn": min_lsn} if min_lsn is not None else None)
+
+    async with session as db:
+        tags = await db.scalars(select(Tag.name).order_by(Tag.name))
+        body = TagsResponse(tags=list(tags)).model_dump_json(by_alias=True).encode()
+
+    snapshot = EncodedBody(body, f'"{hashlib.sha1(body).hexdigest()}"')
+    if settings.TAGS_CACHE:
+        tags_cache.set(snapshot, version)
+
+    return snapshot
+
+
 @router.get(
     "",
     operation_id="GetTags",
@@ -15,7 +47,15 @@ router = APIRouter()
     description="Get tags. Auth not required",
     response_model=TagsResponse,
 )
-async def get_list() -> TagsResponse:
-    async with SessionLocalRo() as db:
-        tags = await db.scalars(select(Tag).order_by(Tag.name))
-        return TagsResponse(tags=[tag.name for tag in tags])
+async def get_list(request: Request) -> Response:
+    snapshot = await _get_snapshot(request)
+
+    headers = {"etag": snapshot.etag}
+    if settings.TAGS_MAX_AGE > 0:
+        headers["cache-control"] = f"public, max-age={settings.TAGS_MAX_AGE}"
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or snapshot.etag in (etag.strip() for etag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(snapshot.body, media_type="application/json", headers=headers)
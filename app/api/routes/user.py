@@ -2,7 +2,8 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.api.deps import CurrentUser, get_users_service
+from app.api.deps import CurrentToken, CurrentTokenPayload, CurrentUser, get_users_service
+from app.core.security import reuse_access_token
 from app.crud.crud_user import UsersRepository
 from app.schemas.users import UpdateUserRequest, UserResponse
 
@@ -18,8 +19,10 @@ router = APIRouter()
 )
 async def current(
     current_user: CurrentUser,
+    token: CurrentToken,
+    payload: CurrentTokenPayload,
 ) -> UserResponse:
-    return UserResponse(user=current_user.schema())
+    return UserResponse(user=current_user.schema(reuse_access_token(token, payload, username=current_user.name)))
 
 
 @router.put(
@@ -31,12 +34,12 @@ async def current(
 )
 async def update(
     current_user: CurrentUser,
+    token: CurrentToken,
+    payload: CurrentTokenPayload,
     update_user: UpdateUserRequest,
     users: Annotated[UsersRepository, Depends(get_users_service)],
 ) -> UserResponse:
-    db_user = await users.get_by_email(email=str(update_user.user.email))
-    if db_user and db_user != current_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-
     db_user = await users.update(db_obj=current_user, obj_in=update_user.user)
-    return UserResponse(user=db_user.schema())
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return UserResponse(user=db_user.schema(reuse_access_token(token, payload, username=db_user.name)))
@@ -0,0 +1,194 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+
+class TTLCache[K: Hashable, V]:
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def items(self) -> list[tuple[K, V]]:
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LRUCache[K: Hashable, V]:
+    def __init__(self, *, maxbytes: int, sizeof: Callable[[V], int]):
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[int, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        size = self.sizeof(value)
+        if size > self.maxbytes:
+            return
+
+        self.delete(key)
+        self._data[key] = (size, value)
+        self.nbytes += size
+
+        while self.nbytes > self.maxbytes:
+            _, (evicted, _) = self._data.popitem(last=False)
+            self.nbytes -= evicted
+
+    def delete(self, key: K) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.nbytes = 0
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def article_json_size(article: dict[str, Any]) -> int:
+    # Rough estimate, walking the object graph with sys.getsizeof would cost more than building the article
+    author = article["author"]
+    return (
+        1024
+        + len(article["title"])
+        + len(article["slug"])
+        + len(article["description"])
+        + len(article["body"])
+        + len(author["username"])
+        + len(author["bio"] or "")
+        + len(author["image"] or "")
+        + 64 * len(article["tagList"])
+    )
+
+
+class EncodedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class SnapshotCache:
+    def __init__(self, *, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.invalidated = False
+        self._value: tuple[float, EncodedBody] | None = None
+
+    def get(self) -> EncodedBody | None:
+        if self._value is None or self._value[0] < time.monotonic():
+            return None
+
+        return self._value[1]
+
+    def set(self, value: EncodedBody, version: int) -> None:
+        # Skip a snapshot loaded before the latest invalidation
+        if version == self.version:
+            self._value = (time.monotonic() + self.ttl, value)
+            self.invalidated = False
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.invalidated = True
+        self._value = None
+
+    def clear(self) -> None:
+        self.version += 1
+        self.invalidated = False
+        self._value = None
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    gzip_body: bytes | None
+    media_type: str
+    tags: frozenset[str]
+
+
+class ResponseCache:
+    def __init__(self, *, maxsize: int, ttl: float):
+        self.entries: TTLCache[str, CachedResponse] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        self.entries.set(key, value)
+
+    def invalidate(self, *tags: str) -> None:
+        self.generation += 1
+
+        # Writes are rare compared to reads, a scan of the bounded entries beats maintaining a tag index
+        for key, value in self.entries.items():
+            if not value.tags.isdisjoint(tags):
+                self.entries.delete(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+
+
+articles_count_cache: TTLCache[Hashable, int] = TTLCache(maxsize=1024, ttl=settings.ARTICLES_COUNT_CACHE_TTL)
+article_dto_cache: LRUCache[Hashable, dict[str, Any]] = LRUCache(
+    maxbytes=settings.ARTICLE_DTO_CACHE_MAXBYTES, sizeof=article_json_size
+)
+tags_cache = SnapshotCache(ttl=settings.TAGS_CACHE_TTL)
+response_cache = ResponseCache(maxsize=settings.RESPONSE_CACHE_MAXSIZE, ttl=settings.RESPONSE_CACHE_TTL)
+token_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.IDENTITY_CACHE_MAXSIZE, ttl=settings.IDENTITY_CACHE_TTL
+)
+identity_cache: TTLCache[int, User] = TTLCache(maxsize=settings.IDENTITY_CACHE_MAXSIZE, ttl=settings.IDENTITY_CACHE_TTL)
+issued_token_cache: TTLCache[tuple[int, str | None], str] = TTLCache(
+    maxsize=settings.JWT_CACHE_MAXSIZE, ttl=(settings.JWT_EXPIRE - settings.JWT_REFRESH_WINDOW) * 60
+)
@@ -1,8 +1,8 @@
 import os
 import secrets
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import ValidationInfo, field_validator
+from pydantic import PositiveInt, ValidationInfo, field_validator
 from pydantic.networks import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,12 +13,56 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
     JWT_SECRET_KEY: str = secrets.token_urlsafe(32)
     JWT_EXPIRE: int = 60 * 24 * 8
+    JWT_EMBED_CLAIMS: bool = False
+    JWT_REFRESH_WINDOW: int = 60 * 24
+    JWT_CACHE_MAXSIZE: int = 10_000
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_ROUNDS: int | None = None
+    PASSWORD_HASH_BUDGET_MS: int = 250
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+
+    ARTICLES_COUNT_STRATEGY: Literal["exact", "cached", "estimated"] = "exact"
+    ARTICLES_COUNT_CACHE_TTL: int = 60
+    ARTICLES_COUNT_ESTIMATE_THRESHOLD: int = 100_000
+    ARTICLES_COUNT_FIRST_PAGE_ONLY: bool = False
+    ARTICLES_COUNT_QUERY: Literal["parallel", "single"] = "parallel"
+    ARTICLES_FILTER_MODE: Literal["fuzzy", "exact"] = "fuzzy"
+
+    FEED_TIMELINE: bool = False
+    FEED_FANOUT_MAX_FOLLOWERS: int = 10_000
+
+    ARTICLE_DTO_CACHE_MAXBYTES: int = 32 * 1024 * 1024
+
+    TAGS_CACHE: bool = False
+    TAGS_CACHE_TTL: int = 300
+    TAGS_MAX_AGE: int = 0
+
+    RESPONSE_CACHE: bool = False
+    RESPONSE_CACHE_TTL: int = 60
+    RESPONSE_CACHE_MAXSIZE: int = 1024
+    RESPONSE_CACHE_GZIP: bool = False
+
+    IDENTITY_CACHE: bool = False
+    IDENTITY_CACHE_TTL: int = 60
+    IDENTITY_CACHE_MAXSIZE: int = 10_000
+
+    READ_YOUR_WRITES: bool = False
+    READ_YOUR_WRITES_MAX_AGE: int = 60
+
+    INTERNAL_STATS: bool = False
 
     DB_HOST: str = "localhost"
     DB_PORT: int = 5433
     DB_DATABASE: str = "main"
     DB_USERNAME: str = "main"
     DB_PASSWORD: str = "main"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_LIFO: bool = False
     DATABASE_URL: PostgresDsn | None = None
     DATABASE_RO_URL: PostgresDsn | None = None
 
@@ -44,7 +88,17 @@ class SettingsReadOnly(BaseSettings):
     DB_DATABASE: str = "main"
     DB_USERNAME: str = "main"
     DB_PASSWORD: str = "main"
+    DB_RO_POOL_SIZE: int = 5
+    DB_RO_MAX_OVERFLOW: int = 10
+    DB_RO_POOL_TIMEOUT: float = 30
+    DB_RO_POOL_RECYCLE: int = -1
+    DB_RO_POOL_LIFO: bool = False
+    DB_RO_WEIGHTS: list[PositiveInt] = []
+    DB_RO_BALANCING: Literal["round_robin", "least_outstanding"] = "round_robin"
+    DB_RO_HEALTH_INTERVAL: float = 5
+    DB_RO_HEALTH_TIMEOUT: float = 2
     DATABASE_RO_URL: PostgresDsn | None = None
+    DATABASE_RO_URLS: list[PostgresDsn] = []
 
     @field_validator("DATABASE_RO_URL")
     def assemble_db_connection(cls, v: str | None, info: ValidationInfo) -> Any:
@@ -56,6 +110,10 @@ class SettingsReadOnly(BaseSettings):
 {info.data["DB_HOST"] or info.data["DB_RO_HOST"]}:{info.data["DB_PORT"]}/{info.data["DB_DATABASE"]}"""
         )
 
+    @field_validator("DATABASE_RO_URLS")
+    def assemble_db_connections(cls, v: list[PostgresDsn], info: ValidationInfo) -> Any:
+        return v or [info.data["DATABASE_RO_URL"]]
+
     model_config = SettingsConfigDict(
         env_file=(".env.testing" if os.getenv("PYTHON_ENVIRONNEMENT") == "testing" else ".env"),
         extra="allow",
@@ -0,0 +1,150 @@
+import gzip
+import json
+import re
+from typing import Any
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import CachedResponse, ResponseCache, response_cache
+from app.core.config import settings
+from app.core.security import sign_lsn
+
+CACHEABLE_PATHS = (
+    re.compile(r"/articles(?P<search>/search)?"),
+    re.compile(r"/articles/(?!feed$)(?P<slug>[^/]+)"),
+    re.compile(r"/articles/(?P<slug>[^/]+)/comments"),
+    re.compile(r"/profiles/(?P<username>[^/]+)"),
+)
+
+GZIP_MIN_SIZE = 500
+
+MIN_LSN_COOKIE = "min_lsn"
+
+
+def response_tags(match: re.Match[str], query: str, data: dict[str, Any]) -> frozenset[str]:
+    tags: set[str] = set()
+
+    if "articles" in data:
+        # New and deleted articles change membership and count of any list
+        tags.add("articles")
+        params = parse_qs(query)
+        tags.update(f"articles:{name}" for name in ("author", "favorited") if name in params)
+        if match.groupdict().get("search"):
+            tags.add("articles:search")
+
+    for article in data.get("articles", [data["article"]] if "article" in data else []):
+        tags.add(f"article:{article['slug']}")
+        # Sparse fieldsets may leave the author out, its changes cannot alter the response then
+        if "author" in article:
+            tags.add(f"profile:{article['author']['username']}")
+
+    if "comments" in data:
+        tags.add(f"comments:{match.group('slug')}")
+        tags.update(f"profile:{comment['author']['username']}" for comment in data["comments"])
+
+    if "profile" in data:
+        tags.add(f"profile:{data['profile']['username']}")
+
+    return frozenset(tags)
+
+
+# Serve anonymous GET requests of public resources from stored JSON bodies,
+# tagged from their content so that repositories can invalidate them on write
+class ResponseCacheMiddleware:
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.RESPONSE_CACHE or scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        path = scope["path"].removeprefix(scope.get("root_path", ""))
+        match = next((m for p in CACHEABLE_PATHS if (m := p.fullmatch(path))), None)
+
+        if "authorization" in headers or match is None:
+            await self.app(scope, receive, send)
+            return
+
+        query = scope["query_string"].decode("latin-1")
+        key = f"{path}?{query}"
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            await self._send_cached(cached, "gzip" in headers.get("accept-encoding", ""), send)
+            return
+
+        # A write committed while this response was built may have already invalidated its content
+        generation = self.cache.generation
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+
+            if message["type"] == "http.response.start":
+                start = message
+                MutableHeaders(scope=message).append("x-cache", "MISS")
+            elif message["type"] == "http.response.body" and start.get("status") == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and generation == self.cache.generation:
+                    self._store(key, match, query, start, b"".join(chunks))
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _store(self, key: str, match: re.Match[str], query: str, start: Message, body: bytes) -> None:
+        media_type = Headers(raw=start["headers"]).get("content-type", "")
+        if not media_type.startswith("application/json"):
+            return
+
+        gzip_body = gzip.compress(body) if settings.RESPONSE_CACHE_GZIP and len(body) >= GZIP_MIN_SIZE else None
+        tags = response_tags(match, query, json.loads(body))
+
+        self.cache.set(key, CachedResponse(body, gzip_body, media_type, tags))
+
+    async def _send_cached(self, cached: CachedResponse, accepts_gzip: bool, send: Send) -> None:
+        headers = MutableHeaders({"content-type": cached.media_type, "x-cache": "HIT"})
+        body = cached.body
+
+        if cached.gzip_body is not None:
+            headers["vary"] = "Accept-Encoding"
+            if accepts_gzip:
+                headers["content-encoding"] = "gzip"
+                body = cached.gzip_body
+
+        headers["content-length"] = str(len(body))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+
+# Hand clients the WAL position of their last write as a cookie, so that their next reads
+# are only routed to replicas which have replayed it
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.READ_YOUR_WRITES or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            # Recorded once the sessions of the request are closed, before its response starts
+            write_lsn = scope.get("state", {}).get("write_lsn")
+            if message["type"] == "http.response.start" and write_lsn is not None:
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{MIN_LSN_COOKIE}={sign_lsn(write_lsn)}; Max-Age={settings.READ_YOUR_WRITES_MAX_AGE}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,21 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(*keys: Any) -> str:
+    payload = json.dumps(keys, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+
+    if not isinstance(keys, list) or len(keys) != size:
+        raise ValueError("Malformed cursor")
+
+    return keys
@@ -1,28 +1,173 @@
+import asyncio
+import functools
+import hashlib
+import hmac
+import math
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import bcrypt
 from jose import jwt
 
+from app.core.cache import issued_token_cache
 from app.core.config import settings
 
 ALGORITHM = "HS256"
 
+MAX_ROUNDS = 31
 
-def create_access_token(subject: str | Any) -> str:
+
+def create_access_token(subject: str | Any, *, username: str | None = None) -> str:
     expire = datetime.now(UTC) + timedelta(minutes=settings.JWT_EXPIRE)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode: dict[str, Any] = {"exp": expire, "sub": str(subject)}
+    if username is not None and settings.JWT_EMBED_CLAIMS:
+        # Stable claims, enough for endpoints where authentication is optional to skip loading the user
+        to_encode["username"] = username
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_access_token(token: str) -> dict[str, str]:
+def get_access_token(subject: int, *, username: str | None = None) -> str:
+    # Issued tokens are handed out again until they get within the refresh window of their expiry
+    key = (subject, username if settings.JWT_EMBED_CLAIMS else None)
+    token = issued_token_cache.get(key)
+    if token is None:
+        token = create_access_token(subject, username=username)
+        issued_token_cache.set(key, token)
+    return token
+
+
+def reuse_access_token(token: str, payload: dict[str, Any], *, username: str) -> str | None:
+    # The token of the caller, unless it nears expiry or its claims are outdated
+    if payload["exp"] - time.time() <= settings.JWT_REFRESH_WINDOW * 60:
+        return None
+    if payload.get("username") != (username if settings.JWT_EMBED_CLAIMS else None):
+        return None
+    return token
+
+
+def decode_access_token(token: str) -> dict[str, Any]:
     return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
 
 
+def sign_lsn(lsn: int) -> str:
+    # Clients cannot forge a position ahead of the primary and pin their reads to it
+    return f"{lsn}.{_lsn_signature(lsn)}"
+
+
+def verify_lsn(value: str) -> int | None:
+    lsn, _, signature = value.partition(".")
+    if not lsn.isdigit() or not hmac.compare_digest(signature, _lsn_signature(int(lsn))):
+        return None
+    return int(lsn)
+
+
+def _lsn_signature(lsn: int) -> str:
+    return hmac.new(settings.JWT_SECRET_KEY.encode(), str(lsn).encode(), hashlib.sha256).hexdigest()
+
+
+def calibrate_password_rounds(budget: float, *, min_rounds: int, probe_rounds: int = 6) -> int:
+    # Each round doubles the cost of bcrypt, time a cheap hash and extrapolate the highest cost within budget
+    elapsed = min(_time_hash(probe_rounds) for _ in range(3))
+    rounds = probe_rounds + math.floor(math.log2(budget / elapsed))
+    return max(min_rounds, min(rounds, MAX_ROUNDS))
+
+
+def _time_hash(rounds: int) -> float:
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+    return time.perf_counter() - start
+
+
+@functools.cache
+def password_rounds() -> int:
+    if settings.PASSWORD_HASH_ROUNDS is not None:
+        return settings.PASSWORD_HASH_ROUNDS
+
+    return calibrate_password_rounds(
+        settings.PASSWORD_HASH_BUDGET_MS / 1000, min_rounds=settings.PASSWORD_HASH_MIN_ROUNDS
+    )
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # A new hash is returned along a successful check when the stored one used a lower cost.
+    # Never downgrade: nodes calibrated on faster hardware would otherwise rehash back and forth with slower ones
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+
+    if bcrypt_rounds(hashed_password) >= password_rounds():
+        return True, None
+
+    return True, get_password_hash(plain_password)
+
+
+def bcrypt_rounds(hashed_password: str) -> int:
+    # $2b$<rounds>$<salt and hash>
+    return int(hashed_password.split("$")[2])
+
+
 def get_password_hash(password: str) -> str:
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(password_rounds()))
     return hashed.decode("utf-8")
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+# bcrypt releases the GIL, hashing in threads keeps the event loop serving other requests meanwhile.
+# Beyond max_pending waiting or running calls, new ones are rejected instead of queuing for seconds
+class PasswordPool:
+    def __init__(self, *, workers: int, max_pending: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    async def run[T](self, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+
+        self.pending += 1
+        queued_at = time.perf_counter()
+
+        def timed() -> tuple[T, float, float]:
+            started_at = time.perf_counter()
+            return func(*args), started_at, time.perf_counter()
+
+        try:
+            result, started_at, finished_at = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+        # Counters are only updated from the event loop
+        self.completed += 1
+        self.wait_time += started_at - queued_at
+        self.run_time += finished_at - started_at
+
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_time": self.wait_time,
+            "run_time": self.run_time,
+        }
+
+
+password_pool = PasswordPool(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
@@ -1,17 +1,44 @@
 import asyncio
-from collections.abc import Sequence
+from collections.abc import Collection, Hashable, Sequence
 from typing import Any
 
 from slugify import slugify
-from sqlalchemy import Select, func, select
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    ColumnExpressionArgument,
+    DateTime,
+    Double,
+    Row,
+    Select,
+    String,
+    cast,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.sql.elements import Label, SQLCoreOperations
 from sqlalchemy.sql.expression import desc
 
+from app.core.cache import articles_count_cache, identity_cache, response_cache, tags_cache
+from app.core.config import settings
 from app.db.session import SessionLocalRo
-from app.models.article import Article
+from app.models.article import Article, article_favorite, article_tag, feed_timeline
 from app.models.tag import Tag
-from app.models.user import User
+from app.models.user import User, follower_user
 from app.schemas.articles import NewArticle, UpdateArticle
 
 
@@ -32,105 +59,532 @@ class ArticlesRepository:
         )
 
     async def get_by_slug(self, *, slug: str) -> Article | None:
-        return await self.dbro.scalar(
-            select(Article)
-            .options(
-                joinedload(Article.tags),
-                joinedload(Article.author).joinedload(User.followers),
-                joinedload(Article.favorited_by),
+        return await self.dbro.scalar(select(Article).filter_by(slug=slug))
+
+    async def get_row_by_slug(self, *, slug: str, user: User | None = None) -> Row[Any] | None:
+        # Row shape of lists, favorited and following read through EXISTS rather than loading whole collections
+        return (await self.dbro.execute(self._list_query(user).filter(Article.slug == slug))).one_or_none()
+
+    def _list_query(self, user: User | None, fields: Collection[str] | None = None) -> Select[Any]:
+        author = aliased(User)
+        return select(*self._columns(author, user, fields)).join(author, Article.author_id == author.id)
+
+    def _columns(
+        self,
+        author: type[User],
+        user: User | None,
+        fields: Collection[str] | None = None,
+        *,
+        favorited: ColumnElement[bool] | None = None,
+    ) -> list[SQLCoreOperations[Any]]:
+        # Row shape read by Article.row_json, shared by list queries and RETURNING clauses of writes
+        def wants(field: str) -> bool:
+            return fields is None or field in fields
+
+        following: ColumnElement[bool] = false()
+
+        if favorited is None:
+            favorited = false()
+            if user and wants("favorited"):
+                favorited = exists().where(
+                    article_favorite.c.article_id == Article.id,
+                    article_favorite.c.user_id == user.id,
+                )
+        if user and wants("author"):
+            following = exists().where(
+                follower_user.c.following_id == Article.author_id,
+                follower_user.c.follower_id == user.id,
             )
-            .filter_by(slug=slug)
-        )
+
+        columns: list[SQLCoreOperations[Any]] = [
+            Article.id,
+            Article.title,
+            Article.slug,
+            Article.created_at,
+            Article.updated_at,
+            author.name.label("author_name"),
+            author.bio.label("author_bio"),
+            author.image.label("author_image"),
+            author.updated_at.label("author_updated_at"),
+            Article.favorites_count,
+            favorited.label("favorited"),
+            following.label("following"),
+        ]
+
+        # Large text columns and the tags aggregate are only read when returned
+        if wants("description"):
+            columns.append(Article.description)
+        if wants("body"):
+            columns.append(Article.body)
+        if wants("tag_list"):
+            columns.append(
+                # Ordered by code point as sorted() in Python, so that every path caches the same tag order
+                select(func.array_agg(aggregate_order_by(Tag.name, Tag.name.collate("C"))))
+                .select_from(article_tag)
+                .join(Tag, Tag.id == article_tag.c.tag_id)
+                .where(article_tag.c.article_id == Article.id)
+                .scalar_subquery()
+                .label("tag_list")
+            )
+
+        return columns
 
     async def get_list(
         self,
         limit: int,
         offset: int,
         *,
+        user: User | None = None,
+        cursor: Sequence[Any] | None = None,
         author: str | None = None,
         tag: str | None = None,
         favorited: str | None = None,
-    ) -> tuple[Sequence[Article], int]:
-        query = select(Article).options(
-            joinedload(Article.author).joinedload(User.followers),
-            joinedload(Article.tags),
-            joinedload(Article.favorited_by),
+        exact: bool | None = None,
+        fields: Collection[str] | None = None,
+    ) -> tuple[Sequence[Row[Any]], int | None]:
+        if exact is None:
+            exact = settings.ARTICLES_FILTER_MODE == "exact"
+
+        if exact:
+            criteria = await self._exact_criteria(author=author, tag=tag, favorited=favorited)
+            if criteria is None:
+                return [], 0
+        else:
+            criteria = self._fuzzy_criteria(author=author, tag=tag, favorited=favorited)
+
+        return await self.get_paginated_list(
+            limit,
+            offset,
+            *criteria,
+            user=user,
+            cursor=cursor,
+            fields=fields,
+            count_key=("articles", author, tag, favorited, exact),
         )
 
+    def _fuzzy_criteria(
+        self, *, author: str | None, tag: str | None, favorited: str | None
+    ) -> list[ColumnElement[bool]]:
+        # Uncorrelated subqueries, so that each ILIKE can be served by the trigram indexes
+        criteria: list[ColumnElement[bool]] = []
+
         if author:
-            query = query.filter(Article.author.has(User.name.ilike(f"%{author}%")))
+            criteria.append(Article.author_id.in_(select(User.id).where(User.name.ilike(f"%{author}%"))))
         if tag:
-            query = query.filter(Article.tags.any(Tag.name.ilike(f"%{tag}%")))
+            criteria.append(
+                Article.id.in_(
+                    select(article_tag.c.article_id)
+                    .join(Tag, Tag.id == article_tag.c.tag_id)
+                    .where(Tag.name.ilike(f"%{tag}%"))
+                )
+            )
         if favorited:
-            query = query.filter(Article.favorited_by.any(User.name.ilike(f"%{favorited}%")))
+            criteria.append(
+                Article.id.in_(
+                    select(article_favorite.c.article_id)
+                    .join(User, User.id == article_favorite.c.user_id)
+                    .where(User.name.ilike(f"%{favorited}%"))
+                )
+            )
 
-        return await self.get_paginated_list(limit, offset, query)
+        return criteria
 
-    async def get_feed(self, limit: int, offset: int, *, user: User) -> tuple[Sequence[Article], int]:
-        query = (
-            select(Article)
-            .options(
-                joinedload(Article.author).joinedload(User.followers),
-                joinedload(Article.tags),
-                joinedload(Article.favorited_by),
+    async def _exact_criteria(
+        self, *, author: str | None, tag: str | None, favorited: str | None
+    ) -> list[ColumnElement[bool]] | None:
+        # Names are resolved to ids first, then articles are filtered through foreign key indexes,
+        # None when a filter cannot match anything
+        criteria: list[ColumnElement[bool]] = []
+
+        if author:
+            author_ids = (await self.dbro.scalars(select(User.id).filter_by(name=author))).all()
+            if not author_ids:
+                return None
+            criteria.append(Article.author_id.in_(author_ids))
+        if tag:
+            tag_id = await self.dbro.scalar(select(Tag.id).filter_by(name=tag))
+            if tag_id is None:
+                return None
+            criteria.append(Article.id.in_(select(article_tag.c.article_id).filter_by(tag_id=tag_id)))
+        if favorited:
+            user_ids = (await self.dbro.scalars(select(User.id).filter_by(name=favorited))).all()
+            if not user_ids:
+                return None
+            criteria.append(
+                Article.id.in_(select(article_favorite.c.article_id).where(article_favorite.c.user_id.in_(user_ids)))
+            )
+
+        return criteria
+
+    async def get_feed(
+        self,
+        limit: int,
+        offset: int,
+        *,
+        user: User,
+        cursor: Sequence[Any] | None = None,
+        fields: Collection[str] | None = None,
+    ) -> tuple[Sequence[Row[Any]], int | None]:
+        criteria: ColumnElement[bool]
+        count_criteria: ColumnElement[bool] | None = None
+
+        if settings.FEED_TIMELINE:
+            # Fanned out articles read from the user timeline, merged with articles of followed authors
+            # with too many followers to be fanned out on write
+            timeline = select(feed_timeline.c.article_id).where(feed_timeline.c.user_id == user.id)
+            pulled = (
+                select(Article.id)
+                .join(follower_user, follower_user.c.following_id == Article.author_id)
+                .join(User, User.id == Article.author_id)
+                .where(follower_user.c.follower_id == user.id, User.fanout_on_read)
             )
-            .filter(Article.author.has(User.followers.any(id=user.id)))
+            count_criteria = Article.id.in_(union_all(timeline, pulled))
+
+            # Each source is read as one index range of its newest ids past the cursor, just enough to fill the page
+            if cursor is not None:
+                timeline = timeline.where(feed_timeline.c.article_id < cursor[0])
+                pulled = pulled.where(Article.id < cursor[0])
+            depth = limit + (offset if cursor is None else 0)
+            criteria = Article.id.in_(
+                union_all(
+                    timeline.order_by(feed_timeline.c.article_id.desc()).limit(depth),
+                    pulled.order_by(Article.id.desc()).limit(depth),
+                )
+            )
+        else:
+            criteria = Article.author.has(User.followers.any(id=user.id))
+
+        return await self.get_paginated_list(
+            limit,
+            offset,
+            criteria,
+            user=user,
+            cursor=cursor,
+            fields=fields,
+            count_key=("feed", user.id),
+            count_criteria=count_criteria,
         )
 
-        return await self.get_paginated_list(limit, offset, query)
+    async def search(
+        self,
+        limit: int,
+        offset: int,
+        *,
+        query: str,
+        user: User | None = None,
+        cursor: Sequence[Any] | None = None,
+        fields: Collection[str] | None = None,
+    ) -> tuple[Sequence[Row[Any]], int | None]:
+        ts_query = func.websearch_to_tsquery("english", query)
+
+        return await self.get_paginated_list(
+            limit,
+            offset,
+            Article.search_vector.bool_op("@@")(ts_query),
+            user=user,
+            cursor=cursor,
+            fields=fields,
+            # Double precision rank, so that its value round trips exactly through the cursor
+            sort_keys=(cast(func.ts_rank(Article.search_vector, ts_query), Double).label("rank"), Article.id),
+            count_key=("search", query),
+        )
 
     async def get_paginated_list(
-        self, limit: int, offset: int, query: Select[tuple[Article]]
-    ) -> tuple[Sequence[Article], int]:
-        query_list = query.order_by(desc(Article.id)).limit(limit).offset(offset)
+        self,
+        limit: int,
+        offset: int,
+        *criteria: ColumnElement[bool],
+        user: User | None = None,
+        cursor: Sequence[Any] | None = None,
+        fields: Collection[str] | None = None,
+        sort_keys: Sequence[ColumnExpressionArgument[Any]] = (Article.id,),
+        count_key: Hashable = None,
+        count_criteria: ColumnElement[bool] | None = None,
+    ) -> tuple[Sequence[Row[Any]], int | None]:
+        # Criteria bounded to the page would undercount, the total is taken over count_criteria when given
+        counted = criteria if count_criteria is None else (count_criteria,)
 
-        async with SessionLocalRo() as db_count:
-            query_count = select(func.count()).select_from(query.subquery())
+        query_list = (
+            self._list_query(user, fields)
+            .add_columns(*[key for key in sort_keys if isinstance(key, Label)])
+            .filter(*criteria)
+            .order_by(*[desc(key) for key in sort_keys])
+            .limit(limit)
+        )
+
+        if cursor is not None:
+            # Keyset pagination : index range scan whatever the depth, offset is ignored
+            query_list = query_list.filter(tuple_(*sort_keys) < tuple_(*[literal(value) for value in cursor]))
+        else:
+            query_list = query_list.offset(offset)
+
+        first_page = cursor is None and offset == 0
+
+        if settings.ARTICLES_COUNT_FIRST_PAGE_ONLY and not first_page:
+            return (await self.dbro.execute(query_list)).all(), None
+
+        if settings.ARTICLES_COUNT_QUERY == "single":
+            return await self._get_list_with_count(query_list, *counted, first_page=first_page, count_key=count_key)
+
+        async with SessionLocalRo(info=self.dbro.info) as db_count:
+            rows, count = await asyncio.gather(
+                self.dbro.execute(query_list),
+                self.count(db_count, *counted, count_key=count_key),
+            )
+
+        return rows.all(), count
+
+    async def _get_list_with_count(
+        self,
+        query_list: Select[Any],
+        *criteria: ColumnElement[bool],
+        first_page: bool,
+        count_key: Hashable = None,
+    ) -> tuple[Sequence[Row[Any]], int]:
+        # Total returned by the list statement itself, on the replica connection already held.
+        # An uncorrelated subquery is run once and, unlike count(*) OVER (), neither defeats the top-N scan
+        # of the sort index nor counts only the rows after the cursor
+        match settings.ARTICLES_COUNT_STRATEGY:
+            case "cached" if count_key is not None:
+                count = articles_count_cache.get(count_key)
+                if count is not None:
+                    return (await self.dbro.execute(query_list)).all(), count
+            case "estimated":
+                estimate = await self._estimated_count(self.dbro, *criteria)
+                if estimate is not None and estimate >= settings.ARTICLES_COUNT_ESTIMATE_THRESHOLD:
+                    return (await self.dbro.execute(query_list)).all(), estimate
+
+        total = select(func.count()).select_from(Article).filter(*criteria).scalar_subquery()
+        rows = (await self.dbro.execute(query_list.add_columns(total.label("articles_count")))).all()
+
+        if rows:
+            count = rows[0].articles_count
+        elif first_page:
+            count = 0
+        else:
+            # Past the last page there is no row to carry the total
+            count = await self._exact_count(self.dbro, *criteria)
 
-            articles, count = await asyncio.gather(self.dbro.scalars(query_list), db_count.scalar(query_count))
+        if settings.ARTICLES_COUNT_STRATEGY == "cached" and count_key is not None:
+            articles_count_cache.set(count_key, count)
+        return rows, count
 
-        return articles.unique().all(), count or 0
+    async def count(self, db: AsyncSession, *criteria: ColumnElement[bool], count_key: Hashable = None) -> int:
+        match settings.ARTICLES_COUNT_STRATEGY:
+            case "cached" if count_key is not None:
+                count = articles_count_cache.get(count_key)
+                if count is None:
+                    count = await self._exact_count(db, *criteria)
+                    articles_count_cache.set(count_key, count)
+                return count
+            case "estimated":
+                estimate = await self._estimated_count(db, *criteria)
+                if estimate is not None and estimate >= settings.ARTICLES_COUNT_ESTIMATE_THRESHOLD:
+                    return estimate
 
-    async def create(self, *, obj_in: NewArticle, author: User) -> Article:
-        db_obj = Article(
-            title=obj_in.title,
-            description=obj_in.description,
-            body=obj_in.body,
-            slug=slugify(obj_in.title),
-            author_id=author.id,
+        return await self._exact_count(db, *criteria)
+
+    async def _exact_count(self, db: AsyncSession, *criteria: ColumnElement[bool]) -> int:
+        return await db.scalar(select(func.count()).select_from(Article).filter(*criteria)) or 0
+
+    async def _estimated_count(self, db: AsyncSession, *criteria: ColumnElement[bool]) -> int | None:
+        if not criteria:
+            # Table statistics maintained by autovacuum, -1 when never analyzed
+            reltuples = await db.scalar(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'articles'::regclass"))
+            return reltuples if reltuples is not None and reltuples >= 0 else None
+
+        conn = await db.connection()
+        # Expanding IN lists of exact filters are rendered as plain parameters, EXPLAIN cannot take them otherwise
+        compiled = (
+            select(Article.id)
+            .filter(*criteria)
+            .compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
         )
+        plan = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        return int(plan.scalar_one()[0]["Plan"]["Plan Rows"])
+
+    async def create(self, *, obj_in: NewArticle, author: User) -> Row[Any] | None:
+        tag_list = list(dict.fromkeys(obj_in.tag_list))
+
+        # Rendered from RETURNING with the author and tags of the request, in the row shape of lists,
+        # None when the slug is already taken
+        row = (
+            await self.db.execute(
+                pg_insert(Article)
+                .values(
+                    title=obj_in.title,
+                    description=obj_in.description,
+                    body=obj_in.body,
+                    slug=slugify(obj_in.title),
+                    author_id=author.id,
+                )
+                .on_conflict_do_nothing(index_elements=[Article.slug])
+                .returning(
+                    Article.id,
+                    Article.title,
+                    Article.slug,
+                    Article.description,
+                    Article.body,
+                    Article.created_at,
+                    Article.updated_at,
+                    literal(author.name, String).label("author_name"),
+                    literal(author.bio, String).label("author_bio"),
+                    literal(author.image, String).label("author_image"),
+                    literal(author.updated_at, DateTime).label("author_updated_at"),
+                    literal(sorted(tag_list), ARRAY(String)).label("tag_list"),
+                    Article.favorites_count,
+                    false().label("favorited"),
+                    false().label("following"),
+                )
+            )
+        ).one_or_none()
+
+        if row is None:
+            return None
 
-        for tag in obj_in.tag_list:
-            db_obj.tags.append(await self.db.scalar(select(Tag).filter_by(name=tag)) or Tag(name=tag))
+        new_tags = await self._link_tags(row.id, tag_list)
+
+        if settings.FEED_TIMELINE:
+            await self._fan_out(row.id, author)
 
-        self.db.add(db_obj)
         await self.db.commit()
-        await self.db.refresh(db_obj)
 
-        return await self.get(db_obj.id) or db_obj
+        articles_count_cache.clear()
+        response_cache.invalidate("articles")
+        if new_tags:
+            tags_cache.invalidate()
+
+        return row
+
+    async def _link_tags(self, article_id: int, names: Sequence[str]) -> bool:
+        if not names:
+            return False
 
-    async def update(self, *, db_obj: Article, obj_in: UpdateArticle) -> Article:
-        db_obj = await self.db.merge(db_obj)
-        db_obj.title = obj_in.title or db_obj.title
-        db_obj.description = obj_in.description or db_obj.description
-        db_obj.body = obj_in.body or db_obj.body
+        created = (
+            await self.db.scalars(
+                pg_insert(Tag)
+                .values([{"name": name} for name in names])
+                .on_conflict_do_nothing(index_elements=[Tag.name])
+                .returning(Tag.id)
+            )
+        ).all()
+
+        # Tags created above or by concurrent transactions are all visible to this next statement
+        await self.db.execute(
+            insert(article_tag).from_select(
+                ["article_id", "tag_id"],
+                select(literal(article_id), Tag.id).where(Tag.name.in_(names)),
+            )
+        )
+
+        return bool(created)
+
+    async def _fan_out(self, article_id: int, author: User) -> None:
+        if not author.fanout_on_read and author.followers_count <= settings.FEED_FANOUT_MAX_FOLLOWERS:
+            await self.db.execute(
+                insert(feed_timeline).from_select(
+                    ["user_id", "article_id"],
+                    select(follower_user.c.follower_id, literal(article_id)).where(
+                        follower_user.c.following_id == author.id
+                    ),
+                )
+            )
+            return
+
+        # Too many followers, articles of this author are merged at read time from now on
+        await self.db.execute(
+            update(User).filter_by(id=author.id).values(fanout_on_read=True, updated_at=User.updated_at)
+        )
+        identity_cache.delete(author.id)
+
+    async def update(self, *, slug: str, obj_in: UpdateArticle, user: User) -> Row[Any] | None:
+        values = {
+            name: value
+            for name, value in (("title", obj_in.title), ("description", obj_in.description), ("body", obj_in.body))
+            if value
+        }
+
+        author = aliased(User)
+
+        # None when there is no such article of this user
+        row = (
+            await self.db.execute(
+                update(Article)
+                .where(Article.slug == slug, Article.author_id == user.id, Article.author_id == author.id)
+                .values(values or {"updated_at": Article.updated_at})
+                .returning(*self._columns(author, user))
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+
+        if row is None:
+            return None
 
-        self.db.add(db_obj)
         await self.db.commit()
-        await self.db.refresh(db_obj)
 
-        return db_obj
+        response_cache.invalidate(f"article:{slug}", "articles:search")
+
+        return row
+
+    async def delete(self, *, slug: str, user: User) -> bool:
+        # Comments, tags, favorites and timeline entries are removed by ON DELETE CASCADE
+        deleted = await self.db.scalar(
+            delete(Article).where(Article.slug == slug, Article.author_id == user.id).returning(Article.id)
+        )
+
+        if deleted is None:
+            return False
 
-    async def delete(self, *, db_obj: Article) -> None:
-        db_obj = await self.db.merge(db_obj)
-        await self.db.delete(db_obj)
         await self.db.commit()
 
-    async def favorite(self, *, db_obj: Article, user: User, favorite: bool = True) -> None:
+        articles_count_cache.clear()
+        response_cache.invalidate("articles", f"article:{slug}", f"comments:{slug}")
+
+        return True
+
+    async def favorite(self, *, slug: str, user: User, favorite: bool = True) -> Row[Any] | None:
+        article_id = select(Article.id).filter_by(slug=slug)
+
+        changed: CTE
         if favorite:
-            db_obj.favorited_by.append(user)
+            changed = (
+                pg_insert(article_favorite)
+                .from_select(["article_id", "user_id"], article_id.add_columns(literal(user.id)))
+                .on_conflict_do_nothing()
+                .returning(article_favorite.c.article_id)
+                .cte("changed")
+            )
         else:
-            db_obj.favorited_by.remove(user)
+            changed = (
+                delete(article_favorite)
+                .where(article_favorite.c.article_id.in_(article_id), article_favorite.c.user_id == user.id)
+                .returning(article_favorite.c.article_id)
+                .cte("changed")
+            )
+
+        author = aliased(User)
+
+        # The counter only moves when the favorite did, and the article is rendered from RETURNING
+        row = (
+            await self.db.execute(
+                update(Article)
+                .where(Article.id == changed.c.article_id, Article.author_id == author.id)
+                .values(
+                    favorites_count=Article.favorites_count + (1 if favorite else -1),
+                    updated_at=Article.updated_at,
+                )
+                .returning(*self._columns(author, user, favorited=true() if favorite else false()))
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+
+        if row is None:
+            # Already in the requested state, or no such article
+            return (await self.db.execute(self._list_query(user).filter(Article.slug == slug))).one_or_none()
 
-        await self.db.merge(db_obj)
         await self.db.commit()
+
+        articles_count_cache.clear()
+        response_cache.invalidate(f"article:{slug}", "articles:favorited")
+
+        return row
@@ -1,11 +1,13 @@
 from collections.abc import Sequence
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, literal, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.expression import desc
 
+from app.core.cache import response_cache
 from app.models.article import Article
 from app.models.comment import Comment
 from app.models.user import User
@@ -24,30 +26,78 @@ class CommentsRepository:
             .filter_by(id=id)
         )
 
-    async def get_list(self, article: Article) -> Sequence[Comment]:
-        return (
-            await self.dbro.scalars(
-                select(Comment)
-                .options(joinedload(Comment.author))
-                .filter_by(article=article)
-                .order_by(desc(Comment.id))
-            )
-        ).all()
+    async def get_list(
+        self, article: Article, *, limit: int | None = None, cursor: int | None = None
+    ) -> Sequence[Comment]:
+        query = select(Comment).options(joinedload(Comment.author)).filter_by(article=article)
+
+        if cursor is not None:
+            # Keyset pagination over the (article_id, id) index
+            query = query.filter(Comment.id < cursor)
+
+        return (await self.dbro.scalars(query.order_by(desc(Comment.id)).limit(limit))).all()
 
-    async def create(self, *, obj_in: NewComment, article: Article, author: User) -> Comment:
-        db_obj = Comment(
-            article_id=article.id,
-            author_id=author.id,
-            body=obj_in.body,
+    async def create(self, *, obj_in: NewComment, slug: str, author: User) -> Comment | None:
+        created = (
+            insert(Comment)
+            .from_select(
+                ["article_id", "author_id", "body"],
+                select(Article.id, literal(author.id), literal(obj_in.body)).filter_by(slug=slug),
+            )
+            .returning(Comment.id, Comment.article_id, Comment.created_at, Comment.updated_at)
+            .cte("created")
         )
-        self.db.add(db_obj)
+
+        # None when there is no such article
+        row = (
+            await self.db.execute(
+                update(Article)
+                .where(Article.id == created.c.article_id)
+                .values(comments_count=Article.comments_count + 1, updated_at=Article.updated_at)
+                .returning(created.c.id, created.c.created_at, created.c.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+
+        if row is None:
+            return None
+
         await self.db.commit()
-        await self.db.refresh(db_obj)
 
-        comment = await self.get(db_obj.id)
-        return comment or db_obj
+        response_cache.invalidate(f"comments:{slug}")
+
+        db_obj = Comment(id=row.id, body=obj_in.body, created_at=row.created_at, updated_at=row.updated_at)
+        # The author is already loaded, attach it without going through its comments collection
+        set_committed_value(db_obj, "author", author)
+        return db_obj
+
+    async def delete(self, *, id: int, slug: str, user: User) -> bool:
+        # Comments can be deleted by their author or by the author of the article
+        deleted = (
+            delete(Comment)
+            .where(
+                Comment.id == id,
+                Comment.article_id == Article.id,
+                Article.slug == slug,
+                or_(Comment.author_id == user.id, Article.author_id == user.id),
+            )
+            .returning(Comment.article_id)
+            .cte("deleted")
+        )
+
+        article_id = await self.db.scalar(
+            update(Article)
+            .where(Article.id == deleted.c.article_id)
+            .values(comments_count=Article.comments_count - 1, updated_at=Article.updated_at)
+            .returning(Article.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        if article_id is None:
+            return False
 
-    async def delete(self, *, db_obj: Comment) -> None:
-        db_obj = await self.db.merge(db_obj)
-        await self.db.delete(db_obj)
         await self.db.commit()
+
+        response_cache.invalidate(f"comments:{slug}")
+
+        return True
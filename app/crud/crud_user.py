@@ -1,9 +1,16 @@
-from sqlalchemy import select
+from collections.abc import Collection
+from typing import Any
+
+from sqlalchemy import CTE, Row, case, delete, exists, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload
 
-from app.core.security import get_password_hash, verify_password
-from app.models.user import User
+from app.core.cache import articles_count_cache, identity_cache, response_cache
+from app.core.config import settings
+from app.core.security import get_password_hash, password_pool, verify_and_update_password
+from app.models.article import Article, feed_timeline
+from app.models.user import User, follower_user
 from app.schemas.users import NewUser, UpdateUser
 
 
@@ -18,47 +25,163 @@ class UsersRepository:
     async def get_by_name(self, *, name: str) -> User | None:
         return await self.dbro.scalar(select(User).options(joinedload(User.followers)).filter_by(name=name))
 
+    async def get_followed_ids(self, *, follower: User, ids: Collection[int]) -> set[int]:
+        if not ids:
+            return set()
+
+        return set(
+            await self.dbro.scalars(
+                select(follower_user.c.following_id).where(
+                    follower_user.c.follower_id == follower.id, follower_user.c.following_id.in_(ids)
+                )
+            )
+        )
+
     async def get_by_email(self, *, email: str) -> User | None:
         return await self.dbro.scalar(select(User).filter_by(email=email))
 
-    async def create(self, *, obj_in: NewUser) -> User:
-        db_obj = User(
-            name=obj_in.username,
-            email=obj_in.email,
-            password=get_password_hash(obj_in.password),
+    async def create(self, *, obj_in: NewUser) -> User | None:
+        # None when the email is already registered
+        db_obj = await self.db.scalar(
+            pg_insert(User)
+            .values(
+                name=obj_in.username,
+                email=obj_in.email,
+                password=await password_pool.run(get_password_hash, obj_in.password),
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        self.db.add(db_obj)
+
+        if db_obj is None:
+            return None
+
+        # Detached, so that it is not expired and read again by the commit
+        self.db.expunge(db_obj)
         await self.db.commit()
-        await self.db.refresh(db_obj)
+
         return db_obj
 
-    async def update(self, *, db_obj: User, obj_in: UpdateUser) -> User:
-        db_obj = await self.db.merge(db_obj)
+    async def update(self, *, db_obj: User, obj_in: UpdateUser) -> User | None:
+        values = {
+            name: value
+            for name, value in (
+                ("name", obj_in.username),
+                ("email", obj_in.email),
+                ("bio", obj_in.bio),
+                ("image", obj_in.image),
+            )
+            if value
+        }
+
+        query = update(User).filter_by(id=db_obj.id)
+        if obj_in.email:
+            # None when the email belongs to another user
+            other = aliased(User)
+            query = query.where(~exists().where(other.email == obj_in.email, other.id != db_obj.id))
+
+        user = await self.db.scalar(query.values(values or {"updated_at": User.updated_at}).returning(User))
 
-        db_obj.name = obj_in.username or db_obj.name
-        db_obj.email = obj_in.email or db_obj.email
-        db_obj.bio = obj_in.bio or db_obj.bio
-        db_obj.image = obj_in.image or db_obj.image
+        if user is None:
+            return None
 
-        self.db.add(db_obj)
+        self.db.expunge(user)
         await self.db.commit()
-        await self.db.refresh(db_obj)
 
-        return db_obj
+        identity_cache.delete(db_obj.id)
+        response_cache.invalidate(f"profile:{db_obj.name}", "articles:author")
+
+        return user
 
     async def authenticate(self, *, email: str, password: str) -> User | None:
         user = await self.get_by_email(email=email)
         if not user or not user.password:
             return None
-        if not verify_password(password, user.password):
+
+        verified, new_hash = await password_pool.run(verify_and_update_password, password, user.password)
+        if not verified:
             return None
+
+        if new_hash is not None:
+            # Hashed with a lower cost by a slower node or a previous calibration, upgraded while the password is known
+            await self.db.execute(
+                update(User).filter_by(id=user.id).values(password=new_hash, updated_at=User.updated_at)
+            )
+            await self.db.commit()
+
         return user
 
-    async def follow(self, *, db_obj: User, follower: User, follow: bool = True) -> None:
+    async def follow(self, *, name: str, follower: User, follow: bool = True) -> Row[Any] | None:
+        following_id = select(User.id).filter_by(name=name).order_by(User.id).limit(1)
+
+        changed: CTE
         if follow:
-            db_obj.followers.append(follower)
+            changed = (
+                pg_insert(follower_user)
+                .from_select(["following_id", "follower_id"], following_id.add_columns(literal(follower.id)))
+                .on_conflict_do_nothing()
+                .returning(follower_user.c.following_id)
+                .cte("changed")
+            )
         else:
-            db_obj.followers.remove(follower)
+            changed = (
+                delete(follower_user)
+                .where(follower_user.c.follower_id == follower.id, follower_user.c.following_id.in_(following_id))
+                .returning(follower_user.c.following_id)
+                .cte("changed")
+            )
+
+        step = 1 if follow else -1
+
+        # Both counters only move when the follow did, in a single update of the two users
+        rows = (
+            await self.db.execute(
+                update(User)
+                .where(User.id.in_([changed.c.following_id, follower.id]))
+                .values(
+                    followers_count=User.followers_count + case((User.id == changed.c.following_id, step), else_=0),
+                    following_count=User.following_count + case((User.id == follower.id, step), else_=0),
+                    updated_at=User.updated_at,
+                )
+                .returning(User.id, User.name, User.bio, User.image, User.fanout_on_read, changed.c.following_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+
+        profile = next((row for row in rows if row.id == row.following_id), None)
+
+        if profile is None:
+            # Already in the requested state, or no such user
+            return (
+                await self.db.execute(
+                    select(User.id, User.name, User.bio, User.image).filter_by(name=name).order_by(User.id).limit(1)
+                )
+            ).one_or_none()
+
+        if settings.FEED_TIMELINE:
+            if follow and not profile.fanout_on_read:
+                await self.db.execute(
+                    pg_insert(feed_timeline)
+                    .from_select(
+                        ["user_id", "article_id"],
+                        select(literal(follower.id), Article.id).where(Article.author_id == profile.id),
+                    )
+                    .on_conflict_do_nothing()
+                )
+            elif not follow:
+                # Also drops rows fanned out before the author switched to fan-out on read
+                await self.db.execute(
+                    delete(feed_timeline).where(
+                        feed_timeline.c.user_id == follower.id,
+                        feed_timeline.c.article_id.in_(select(Article.id).filter_by(author_id=profile.id)),
+                    )
+                )
 
-        await self.db.merge(db_obj)
         await self.db.commit()
+
+        # Both counters changed
+        identity_cache.delete(follower.id)
+        identity_cache.delete(profile.id)
+        articles_count_cache.clear()
+
+        return profile
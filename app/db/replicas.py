@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from typing import Any, Literal, cast
+
+from sqlalchemy import Engine, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.db.pool import MeasuredQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, weight: int = 1):
+        self.engine = engine
+        # Probes connect on their own, a request pool exhausted under load must not get the replica ejected
+        self.probe_engine = create_async_engine(engine.url, poolclass=NullPool)
+        self.weight = weight
+        self.healthy = True
+        self.current_weight = 0
+        # Until probed, a replica is assumed to lag behind any write
+        self.standby = True
+        self.replay_lsn: int | None = None
+
+    @property
+    def name(self) -> str:
+        url = self.engine.url
+        return f"{url.host}:{url.port}/{url.database}"
+
+    def has_replayed(self, lsn: int) -> bool:
+        # A server out of recovery is the primary itself
+        return not self.standby or (self.replay_lsn is not None and self.replay_lsn >= lsn)
+
+    @property
+    def outstanding(self) -> int:
+        return self.pool.checkedout()
+
+    @property
+    def pool(self) -> MeasuredQueuePool:
+        return cast(MeasuredQueuePool, self.engine.pool)
+
+
+# Read replicas sharing the read sessions, ejected while their health probe fails,
+# the primary serving reads when none is healthy
+class ReplicaSet:
+    def __init__(
+        self,
+        replicas: Sequence[Replica],
+        *,
+        primary: AsyncEngine,
+        balancing: Literal["round_robin", "least_outstanding"] = "round_robin",
+        health_interval: float = 5,
+        health_timeout: float = 2,
+    ):
+        self.replicas = list(replicas)
+        self.primary = primary
+        self.balancing = balancing
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [replica.engine for replica in self.replicas]
+
+    def choose(self, min_lsn: int | None = None) -> AsyncEngine:
+        # Replicas which have not yet replayed min_lsn would miss writes the reader expects to see
+        healthy = [
+            replica
+            for replica in self.replicas
+            if replica.healthy and (min_lsn is None or replica.has_replayed(min_lsn))
+        ]
+        if not healthy:
+            return self.primary
+
+        if self.balancing == "least_outstanding":
+            return min(healthy, key=lambda replica: (replica.outstanding + 1) / replica.weight).engine
+
+        # Smooth weighted round robin, as in nginx : heavier replicas are picked more often, never in bursts
+        total = 0
+        for replica in healthy:
+            replica.current_weight += replica.weight
+            total += replica.weight
+        chosen = max(healthy, key=lambda replica: replica.current_weight)
+        chosen.current_weight -= total
+        return chosen.engine
+
+    async def check_health(self) -> None:
+        await asyncio.gather(*[self._probe(replica) for replica in self.replicas])
+
+    async def _probe(self, replica: Replica) -> None:
+        try:
+            async with asyncio.timeout(self.health_timeout), replica.probe_engine.connect() as conn:
+                standby, replay_lsn = (
+                    await conn.execute(text("SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn() - '0/0'"))
+                ).one()
+        except TimeoutError, OSError, exc.SQLAlchemyError:
+            replica.healthy = False
+        else:
+            replica.healthy = True
+            replica.standby = standby
+            replica.replay_lsn = int(replay_lsn) if replay_lsn is not None else None
+
+    async def run_health_checks(self) -> None:
+        while True:
+            # An unexpected error would otherwise end the loop and freeze the health of every replica
+            try:
+                await self.check_health()
+            except Exception:
+                logger.exception("Replica health check failed")
+            await asyncio.sleep(self.health_interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            replica.name: {
+                "healthy": replica.healthy,
+                "weight": replica.weight,
+                "replay_lsn": replica.replay_lsn,
+                **replica.pool.stats(),
+            }
+            for replica in self.replicas
+        }
+
+
+# Session reading from the replica chosen on its first statement, kept until it is closed
+# so that a transaction never spans several connections
+class ReplicaSession(Session):
+    def __init__(self, *args: Any, replicas: ReplicaSet, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.replica_bind: Engine | None = None
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Engine:
+        if self.replica_bind is None:
+            self.replica_bind = self.replicas.choose(self.info.get("min_lsn")).sync_engine
+        return self.replica_bind
+
+    def close(self) -> None:
+        super().close()
+        self.replica_bind = None
+
+
+# Session of the primary flagging its commits, whose WAL position readers may then wait for on replicas
+class PrimarySession(Session):
+    def commit(self) -> None:
+        super().commit()
+        self.info["committed"] = True
@@ -1,9 +1,50 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings, settingsReadOnly
+from app.db.pool import MeasuredQueuePool
+from app.db.replicas import PrimarySession, Replica, ReplicaSession, ReplicaSet
 
-engine = create_async_engine(settings.DATABASE_URL.__str__(), pool_pre_ping=True)
-SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+engine = create_async_engine(
+    settings.DATABASE_URL.__str__(),
+    pool_pre_ping=True,
+    poolclass=MeasuredQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_use_lifo=settings.DB_POOL_LIFO,
+)
+SessionLocal = async_sessionmaker(
+    sync_session_class=PrimarySession, autocommit=False, autoflush=False, bind=engine, future=True
+)
 
-engineReadOnly = create_async_engine(settingsReadOnly.DATABASE_RO_URL.__str__(), pool_pre_ping=True)
-SessionLocalRo = async_sessionmaker(autocommit=False, autoflush=False, bind=engineReadOnly, future=True)
+replicas = ReplicaSet(
+    [
+        Replica(
+            create_async_engine(
+                url.__str__(),
+                pool_pre_ping=True,
+                poolclass=MeasuredQueuePool,
+                pool_size=settingsReadOnly.DB_RO_POOL_SIZE,
+                max_overflow=settingsReadOnly.DB_RO_MAX_OVERFLOW,
+                pool_timeout=settingsReadOnly.DB_RO_POOL_TIMEOUT,
+                pool_recycle=settingsReadOnly.DB_RO_POOL_RECYCLE,
+                pool_use_lifo=settingsReadOnly.DB_RO_POOL_LIFO,
+            ),
+            weight=settingsReadOnly.DB_RO_WEIGHTS[i] if i < len(settingsReadOnly.DB_RO_WEIGHTS) else 1,
+        )
+        for i, url in enumerate(settingsReadOnly.DATABASE_RO_URLS)
+    ],
+    primary=engine,
+    balancing=settingsReadOnly.DB_RO_BALANCING,
+    health_interval=settingsReadOnly.DB_RO_HEALTH_INTERVAL,
+    health_timeout=settingsReadOnly.DB_RO_HEALTH_TIMEOUT,
+)
+SessionLocalRo = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReplicaSession,
+    autocommit=False,
+    autoflush=False,
+    future=True,
+    replicas=replicas,
+)
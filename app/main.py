@@ -1,10 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.api import router
 from app.core.config import settings
+from app.core.middleware import ReadYourWritesMiddleware, ResponseCacheMiddleware
+from app.core.security import PasswordPoolBusy, password_rounds
+from app.db.session import replicas
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    # Calibrated once per worker before serving, rather than within its first login or registration
+    password_rounds()
+    health_checks = asyncio.create_task(replicas.run_health_checks())
+    yield
+    health_checks.cancel()
+
 
-app = FastAPI(debug=settings.DEBUG, docs_url=None, openapi_url=None, redoc_url=None)
+app = FastAPI(debug=settings.DEBUG, docs_url=None, openapi_url=None, redoc_url=None, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,5 +47,17 @@ api = FastAPI(
     redoc_url=None,
 )
 api.include_router(router)
+api.add_middleware(ResponseCacheMiddleware)
+api.add_middleware(ReadYourWritesMiddleware)
+
+
+@api.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many logins in progress, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
 
 app.mount("/api", api)
@@ -1,11 +1,14 @@
+from collections.abc import Callable, Collection, Hashable
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Integer, Row, String, Table, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.cache import article_dto_cache
 from app.db.base_class import Base
-from app.schemas.articles import Article as ArticleDto
+from app.schemas.articles import ARTICLE_FIELDS
 from app.schemas.base import convert_datetime_to_realworld
 
 if TYPE_CHECKING:
@@ -26,6 +29,7 @@ article_tag: Table = Table(
         primary_key=True,
     ),
     Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_article_tag_tag_id", "tag_id"),
 )
 
 article_favorite: Table = Table(
@@ -38,20 +42,47 @@ article_favorite: Table = Table(
         primary_key=True,
     ),
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_article_favorite_user_id", "user_id"),
+)
+
+feed_timeline: Table = Table(
+    "feed_timeline",
+    Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column(
+        "article_id",
+        Integer,
+        ForeignKey("articles.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Index("ix_feed_timeline_article_id", "article_id"),
 )
 
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
     slug: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     body: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False, onupdate=datetime.now)
+    favorites_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    comments_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', description), 'B') || "
+            "setweight(to_tsvector('english', body), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     author: Mapped[User] = relationship("User", back_populates="articles")
     comments: Mapped[list[Comment]] = relationship("Comment", back_populates="article", uselist=True)
@@ -63,19 +94,95 @@ class Article(Base):
         uselist=True,
     )
 
-    def schema(self, user: User | None = None) -> ArticleDto:
-        tags = [tag.name for tag in self.tags]
-        tags.sort()
-
-        return ArticleDto(
-            title=self.title,
-            slug=self.slug,
-            description=self.description,
-            body=self.body,
-            created_at=convert_datetime_to_realworld(self.created_at),
-            updated_at=convert_datetime_to_realworld(self.updated_at),
-            tag_list=tags,
-            author=self.author.profile(user),
-            favorited=user is not None and self.favorited_by.__contains__(user),
-            favorites_count=len(self.favorited_by),
+    # Articles are rendered straight to camelCase JSON-ready dicts, see ArticleDto for their shape
+    @staticmethod
+    def row_json(row: Row[Any], fields: Collection[str] | None = None) -> dict[str, Any]:
+        def build() -> dict[str, Any]:
+            return _shared_json(
+                title=row.title,
+                slug=row.slug,
+                description=row.description,
+                body=row.body,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                tag_list=row.tag_list or [],
+                author_name=row.author_name,
+                author_bio=row.author_bio,
+                author_image=row.author_image,
+            )
+
+        key = (row.id, row.updated_at, row.author_updated_at)
+
+        if fields is None:
+            shared = _cached_json(key, build)
+        else:
+            # Rows of a sparse fieldset lack some columns, reuse a complete cached article but never store one
+            shared = article_dto_cache.get(key) or _shared_json(
+                title=row.title,
+                slug=row.slug,
+                description=row._mapping.get("description", ""),
+                body=row._mapping.get("body", ""),
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                tag_list=row._mapping.get("tag_list") or [],
+                author_name=row.author_name,
+                author_bio=row.author_bio,
+                author_image=row.author_image,
+            )
+
+        article = _for_viewer(
+            shared,
+            favorited=row.favorited,
+            following=row.following,
+            favorites_count=row.favorites_count,
         )
+
+        if fields is None:
+            return article
+
+        return {alias: article[alias] for alias, name in ARTICLE_FIELDS.items() if name in fields}
+
+
+def _shared_json(
+    *,
+    title: str,
+    slug: str,
+    description: str,
+    body: str,
+    created_at: datetime,
+    updated_at: datetime,
+    tag_list: list[str],
+    author_name: str,
+    author_bio: str | None,
+    author_image: str | None,
+) -> dict[str, Any]:
+    return {
+        "title": title,
+        "slug": slug,
+        "description": description,
+        "body": body,
+        "createdAt": convert_datetime_to_realworld(created_at),
+        "updatedAt": convert_datetime_to_realworld(updated_at),
+        "tagList": tag_list,
+        "author": {"username": author_name, "bio": author_bio, "image": author_image, "following": False},
+        "favorited": False,
+        "favoritesCount": 0,
+    }
+
+
+# Viewer independent part of the article, invalidated by any update of the article or its author
+def _cached_json(key: Hashable, build: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    shared = article_dto_cache.get(key)
+    if shared is None:
+        shared = build()
+        article_dto_cache.set(key, shared)
+
+    return shared
+
+
+def _for_viewer(shared: dict[str, Any], *, favorited: bool, following: bool, favorites_count: int) -> dict[str, Any]:
+    article = {**shared, "favorited": favorited, "favoritesCount": favorites_count}
+    if following:
+        article["author"] = {**shared["author"], "following": True}
+
+    return article
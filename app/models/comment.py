@@ -1,12 +1,13 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
 from app.schemas.base import convert_datetime_to_realworld
 from app.schemas.comments import Comment as CommentDto
+from app.schemas.profiles import Profile as ProfileDto
 
 if TYPE_CHECKING:
     from app.models.article import Article
@@ -15,6 +16,7 @@ if TYPE_CHECKING:
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_article_id_id", "article_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     article_id: Mapped[int] = mapped_column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
@@ -26,11 +28,17 @@ class Comment(Base):
     article: Mapped[Article] = relationship("Article", back_populates="comments")
     author: Mapped[User] = relationship("User", back_populates="comments")
 
-    def schema(self, user: User | None = None) -> CommentDto:
+    # Whether the viewer follows the author is resolved by the caller, for all comments of a page at once
+    def schema(self, following: bool = False) -> CommentDto:
         return CommentDto(
             id=self.id,
             body=self.body,
             created_at=convert_datetime_to_realworld(self.created_at),
             updated_at=convert_datetime_to_realworld(self.updated_at),
-            author=self.author.profile(user),
+            author=ProfileDto(
+                username=self.author.name,
+                bio=self.author.bio,
+                image=self.author.image,
+                following=following,
+            ),
         )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Table, Text, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core import security
@@ -30,18 +30,25 @@ follower_user = Table(
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    Index("ix_follower_user_following_id", "following_id"),
 )
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False, index=True)
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     password: Mapped[str | None] = mapped_column(String)
     bio: Mapped[str | None] = mapped_column(Text)
     image: Mapped[str | None] = mapped_column(String)
+    fanout_on_read: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    followers_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    following_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at = mapped_column(DateTime, default=datetime.now, nullable=False)
     updated_at = mapped_column(DateTime, default=datetime.now, nullable=False, onupdate=datetime.now)
 
@@ -62,13 +69,13 @@ class User(Base):
         secondary=article_favorite,
     )
 
-    def schema(self) -> UserDto:
+    def schema(self, token: str | None = None) -> UserDto:
         return UserDto(
             username=self.name,
             email=self.email,
             bio=self.bio,
             image=self.image,
-            token=security.create_access_token(self.id),
+            token=token or security.get_access_token(self.id, username=self.name),
         )
 
     def profile(self, user: User | None = None) -> ProfileDto:
@@ -76,5 +83,5 @@ class User(Base):
             username=self.name,
             bio=self.bio,
             image=self.image,
-            following=user is not None and self.followers.__contains__(user),
+            following=user is not None and any(follower.id == user.id for follower in self.followers),
         )
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from sqlalchemy import delete, func, insert, select, update
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.article import Article, article_favorite, feed_timeline
+from app.models.comment import Comment
+from app.models.tag import Tag  # noqa
+from app.models.user import User, follower_user
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def repair_feed() -> None:
+    async with SessionLocal() as db:
+        logger.info("Flag authors with more than %d followers as fan-out on read", settings.FEED_FANOUT_MAX_FOLLOWERS)
+
+        await db.execute(
+            update(User)
+            .where(
+                User.id.in_(
+                    select(follower_user.c.following_id)
+                    .group_by(follower_user.c.following_id)
+                    .having(func.count() > settings.FEED_FANOUT_MAX_FOLLOWERS)
+                )
+            )
+            .values(fanout_on_read=True, updated_at=User.updated_at)
+        )
+
+        logger.info("Rebuild feed timeline")
+
+        await db.execute(delete(feed_timeline))
+        await db.execute(
+            insert(feed_timeline).from_select(
+                ["user_id", "article_id"],
+                select(follower_user.c.follower_id, Article.id)
+                .join(follower_user, follower_user.c.following_id == Article.author_id)
+                .join(User, User.id == Article.author_id)
+                .where(~User.fanout_on_read),
+            )
+        )
+
+        await db.commit()
+
+
+async def repair_counters() -> None:
+    async with SessionLocal() as db:
+        logger.info("Rebuild article counters")
+
+        await db.execute(
+            update(Article).values(
+                favorites_count=select(func.count())
+                .select_from(article_favorite)
+                .where(article_favorite.c.article_id == Article.id)
+                .scalar_subquery(),
+                comments_count=select(func.count())
+                .select_from(Comment)
+                .where(Comment.article_id == Article.id)
+                .scalar_subquery(),
+                updated_at=Article.updated_at,
+            )
+        )
+
+        logger.info("Rebuild user counters")
+
+        await db.execute(
+            update(User).values(
+                followers_count=select(func.count())
+                .select_from(follower_user)
+                .where(follower_user.c.following_id == User.id)
+                .scalar_subquery(),
+                following_count=select(func.count())
+                .select_from(follower_user)
+                .where(follower_user.c.follower_id == User.id)
+                .scalar_subquery(),
+                updated_at=User.updated_at,
+            )
+        )
+
+        await db.commit()
+
+
+TARGETS = {
+    "counters": repair_counters,
+    "feed": repair_feed,
+}
+
+
+async def main(targets: list[str]) -> None:
+    for target in targets:
+        await TARGETS[target]()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild denormalized data from source tables")
+    parser.add_argument("targets", nargs="*", choices=sorted(TARGETS), help="default to all targets")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.targets or sorted(TARGETS)))
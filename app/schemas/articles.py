@@ -38,10 +38,15 @@ class Article(BaseModel):
     favorites_count: int
 
 
+# Article field names by their camelCase name in responses
+ARTICLE_FIELDS: dict[str, str] = {field.alias or name: name for name, field in Article.model_fields.items()}
+
+
 class SingleArticleResponse(BaseModel):
     article: Article
 
 
 class MultipleArticlesResponse(BaseModel):
     articles: list[Article]
-    articles_count: int
+    articles_count: int | None
+    next_cursor: str | None = None
@@ -26,3 +26,4 @@ class SingleCommentResponse(BaseModel):
 
 class MultipleCommentsResponse(BaseModel):
     comments: list[Comment]
+    next_cursor: str | None = None
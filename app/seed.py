@@ -18,6 +18,8 @@ from app.models.article import Article
 from app.models.comment import Comment
 from app.models.tag import Tag
 from app.models.user import User
+from app.repair import TARGETS
+from app.repair import main as repair
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -111,6 +113,8 @@ async def main() -> None:
 
     await db.commit()
 
+    await repair(sorted(TARGETS))
+
 
 if __name__ == "__main__":
     asyncio.run(main())
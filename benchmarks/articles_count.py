@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any
+
+from sqlalchemy import delete, event, exc, insert
+from starlette.types import Message
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine, replicas
+from app.main import app
+from app.models.article import Article
+from app.models.user import User
+
+# Compare counting articles on a second replica session in parallel with counting them in the list statement,
+# under concurrent requests against the configured database, seeded with articles removed afterwards.
+# With the default pools, parallel counts can exhaust the replica pool from 15 concurrent requests on:
+# each one holds a connection for its list while waiting for another for its count
+
+AUTHOR = "Benchmark Author"
+
+
+class PoolOccupancy:
+    # Connections checked out of both pools, peak and averaged over time
+    def __init__(self) -> None:
+        self.current = self.peak = 0
+        self.area = 0.0
+        self.since = self.start = time.perf_counter()
+
+    def _move(self, step: int) -> None:
+        now = time.perf_counter()
+        self.area += self.current * (now - self.since)
+        self.since = now
+        self.current += step
+        self.peak = max(self.peak, self.current)
+
+    def checkout(self, *args: Any) -> None:
+        self._move(1)
+
+    def checkin(self, *args: Any) -> None:
+        self._move(-1)
+
+    @property
+    def mean(self) -> float:
+        self._move(0)
+        return self.area / (self.since - self.start)
+
+
+async def seed(articles: int) -> int:
+    async with SessionLocal() as db:
+        author_id = await db.scalar(
+            insert(User)
+            .values(name=AUTHOR, email="benchmark.author@example.com", password="", bio="", image=None)
+            .returning(User.id)
+        )
+        await db.execute(
+            insert(Article),
+            [
+                {
+                    "author_id": author_id,
+                    "title": f"Benchmark {i}",
+                    "slug": f"benchmark-{i}",
+                    "description": "Lorem ipsum dolor sit amet",
+                    "body": "Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. " * 10,
+                }
+                for i in range(articles)
+            ],
+        )
+        await db.commit()
+    return author_id or 0
+
+
+async def clean(author_id: int) -> None:
+    async with SessionLocal() as db:
+        await db.execute(delete(Article).filter_by(author_id=author_id))
+        await db.execute(delete(User).filter_by(id=author_id))
+        await db.commit()
+
+
+async def call(path: str, query: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+    status = 0
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(articles: int, concurrency: int, requests: int) -> tuple[list[float], int, PoolOccupancy]:
+    latencies: list[float] = []
+    errors = 0
+
+    async def client() -> None:
+        nonlocal errors
+        for _ in range(requests):
+            query = f"limit=20&offset={random.randrange(0, articles, 20)}&author={AUTHOR}"
+            start = time.perf_counter()
+            try:
+                status = await call("/api/articles", query)
+            except exc.TimeoutError:
+                status = 500
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+
+    occupancy = PoolOccupancy()
+    for pooled in (engine, *replicas.engines):
+        event.listen(pooled.sync_engine, "checkout", occupancy.checkout)
+        event.listen(pooled.sync_engine, "checkin", occupancy.checkin)
+
+    latencies.clear()
+    errors = 0
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+
+    for pooled in (engine, *replicas.engines):
+        event.remove(pooled.sync_engine, "checkout", occupancy.checkout)
+        event.remove(pooled.sync_engine, "checkin", occupancy.checkin)
+
+    return latencies, errors, occupancy
+
+
+async def main(articles: int, concurrency: int, requests: int) -> None:
+    author_id = await seed(articles)
+
+    try:
+        print(f"{'query':<10}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>9}{'errors':>8}{'peak conn':>11}{'mean conn':>11}")
+
+        for mode in ("parallel", "single"):
+            settings.ARTICLES_COUNT_QUERY = mode  # type: ignore[assignment]
+            latencies, errors, occupancy = await measure(articles, concurrency, requests)
+            elapsed = time.perf_counter() - occupancy.start
+
+            p50 = statistics.median(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1]
+            rate = concurrency * requests / elapsed
+            print(f"{mode:<10}{p50:>9.1f}{p95:>9.1f}{rate:>9.0f}{errors:>8}{occupancy.peak:>11}{occupancy.mean:>11.1f}")
+    finally:
+        await clean(author_id)
+        await engine.dispose()
+        for replica in replicas.engines:
+            await replica.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark articles list with parallel or single query count")
+    parser.add_argument("-a", "--articles", type=int, default=5000, help="articles seeded")
+    parser.add_argument("-c", "--concurrency", type=int, default=12, help="concurrent clients")
+    parser.add_argument("-n", "--requests", type=int, default=50, help="requests per client and mode")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.articles, args.concurrency, args.requests))
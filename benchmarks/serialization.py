@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.types import Message
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+from app.api.responses import FastJSONResponse
+from app.core.cache import article_dto_cache
+from app.models.article import Article
+from app.schemas.articles import Article as ArticleDto
+from app.schemas.articles import MultipleArticlesResponse, SingleArticleResponse
+from app.schemas.base import convert_datetime_to_realworld
+from app.schemas.profiles import Profile as ProfileDto
+from app.schemas.profiles import ProfileResponse
+
+# Compare the previous path (validated DTOs returned through response_model) with FastJSONResponse
+# on the same rows, without database, so that only building and serializing responses is measured
+
+
+def make_row(i: int) -> SimpleNamespace:
+    now = datetime.now()
+    return SimpleNamespace(
+        id=i,
+        title=f"Article title {i}",
+        slug=f"article-title-{i}",
+        description="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 2,
+        body="Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. " * 30,
+        created_at=now,
+        updated_at=now,
+        author_name=f"Author {i}",
+        author_bio="Ut enim ad minim veniam, quis nostrud exercitation. " * 3,
+        author_image="https://randomuser.me/api/portraits/men/1.jpg",
+        author_updated_at=now,
+        tag_list=["lorem", "ipsum", "dolor"],
+        favorited=i % 2 == 0,
+        following=i % 3 == 0,
+        favorites_count=i,
+    )
+
+
+def validated_row_schema(row: Any) -> ArticleDto:
+    return ArticleDto(
+        title=row.title,
+        slug=row.slug,
+        description=row.description,
+        body=row.body,
+        created_at=convert_datetime_to_realworld(row.created_at),
+        updated_at=convert_datetime_to_realworld(row.updated_at),
+        tag_list=row.tag_list or [],
+        author=ProfileDto(
+            username=row.author_name,
+            bio=row.author_bio,
+            image=row.author_image,
+            following=row.following,
+        ),
+        favorited=row.favorited,
+        favorites_count=row.favorites_count,
+    )
+
+
+def build_app(rows: list[SimpleNamespace]) -> FastAPI:
+    app = FastAPI()
+    row = rows[0]
+
+    @app.get("/validated/articles", response_model=MultipleArticlesResponse)
+    async def validated_list() -> MultipleArticlesResponse:
+        return MultipleArticlesResponse(articles=[validated_row_schema(row) for row in rows], articles_count=len(rows))
+
+    @app.get("/fast/articles", response_model=MultipleArticlesResponse)
+    async def fast_list() -> FastJSONResponse:
+        return FastJSONResponse(
+            {"articles": [Article.row_json(row) for row in rows], "articlesCount": len(rows), "nextCursor": None}
+        )
+
+    @app.get("/validated/article", response_model=SingleArticleResponse)
+    async def validated_single() -> SingleArticleResponse:
+        return SingleArticleResponse(article=validated_row_schema(row))
+
+    @app.get("/fast/article", response_model=SingleArticleResponse)
+    async def fast_single() -> FastJSONResponse:
+        return FastJSONResponse({"article": Article.row_json(row)})
+
+    @app.get("/validated/profile", response_model=ProfileResponse)
+    async def validated_profile() -> ProfileResponse:
+        return ProfileResponse(
+            profile=ProfileDto(username=row.author_name, bio=row.author_bio, image=row.author_image, following=True)
+        )
+
+    @app.get("/fast/profile", response_model=ProfileResponse)
+    async def fast_profile() -> FastJSONResponse:
+        return FastJSONResponse(
+            ProfileResponse(
+                profile=ProfileDto(username=row.author_name, bio=row.author_bio, image=row.author_image, following=True)
+            )
+        )
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("testserver", 80),
+        "client": ("testclient", 50000),
+    }
+    body = bytearray()
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def measure(app: FastAPI, path: str, requests: int, before: Callable[[], None]) -> float:
+    for _ in range(min(requests, 100)):
+        before()
+        await call(app, path)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        before()
+        await call(app, path)
+
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main(requests: int, cached: bool) -> None:
+    app = build_app([make_row(i) for i in range(20)])
+
+    # Without the DTO cache every request pays for building the DTOs, as on a cold cache
+    before = (lambda: None) if cached else article_dto_cache.clear
+
+    print(f"{'endpoint':<12}{'validated µs':>14}{'fast µs':>12}{'speedup':>10}")
+
+    for endpoint in ("articles", "article", "profile"):
+        validated, fast = await call(app, f"/validated/{endpoint}"), await call(app, f"/fast/{endpoint}")
+        assert validated == fast, f"{endpoint} responses differ"
+
+        validated_us = await measure(app, f"/validated/{endpoint}", requests, before)
+        fast_us = await measure(app, f"/fast/{endpoint}", requests, before)
+
+        print(f"{endpoint:<12}{validated_us:>14.1f}{fast_us:>12.1f}{validated_us / fast_us:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests per endpoint and path")
+    parser.add_argument("--cached", action="store_true", help="keep article DTOs cached between requests")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.cached))
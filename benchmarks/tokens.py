@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+
+import app.main  # noqa: F401
+from app.core.cache import issued_token_cache
+from app.core.security import create_access_token, decode_access_token, reuse_access_token
+from app.models.user import User
+from app.schemas.users import UserResponse
+
+# CPU spent on the token for each GET /user: the caller's token is always decoded by authentication,
+# then it was signed again for the response, it is now returned as is or taken from the issued tokens
+
+
+def measure(func: Callable[[], object], requests: int) -> float:
+    for _ in range(min(requests, 100)):
+        func()
+
+    start = time.process_time()
+    for _ in range(requests):
+        func()
+
+    return (time.process_time() - start) / requests * 1_000_000
+
+
+def main(requests: int) -> None:
+    user = User(id=1, name="John Doe", email="john.doe@example.com", bio="John Bio", image=None)
+    token = create_access_token(user.id)
+
+    def signed() -> UserResponse:
+        decode_access_token(token)
+        return UserResponse(user=user.schema(create_access_token(user.id)))
+
+    def reused() -> UserResponse:
+        payload = decode_access_token(token)
+        return UserResponse(user=user.schema(reuse_access_token(token, payload, username=user.name)))
+
+    def issued() -> UserResponse:
+        decode_access_token(token)
+        return UserResponse(user=user.schema())
+
+    issued_token_cache.clear()
+
+    signed_us = measure(signed, requests)
+    print(f"{'path':<10}{'cpu µs':>10}{'saved':>10}")
+    print(f"{'signed':<10}{signed_us:>10.1f}")
+    for name, func in (("reused", reused), ("issued", issued)):
+        us = measure(func, requests)
+        print(f"{name:<10}{us:>10.1f}{1 - us / signed_us:>9.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark token handling of GET /user")
+    parser.add_argument("-n", "--requests", type=int, default=5000, help="requests per path")
+    args = parser.parse_args()
+
+    main(args.requests)
@@ -97,3 +97,26 @@ async def test_can_create_article(client: TestClient, db: AsyncSession) -> None:
     }.items() <= r.json()["article"].items()
     assert await db.scalar(select(Article).filter_by(slug="test-title")) is not None
     assert len((await db.scalars(select(Tag))).all()) == 3
+
+
+async def test_can_create_article_with_repeated_and_existing_tags(client: TestClient, db: AsyncSession) -> None:
+    db.add(Tag(name="Tag 1"))
+    db.add(Tag(name="Tag 2"))
+    await db.commit()
+
+    await acting_as_john(db, client)
+
+    r = client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "Test Title",
+                "description": "Test Description",
+                "body": "Test Body",
+                "tagList": ["Tag 2", "Tag 1", "Tag 2"],
+            }
+        },
+    )
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["article"]["tagList"] == ["Tag 1", "Tag 2"]
+    assert len((await db.scalars(select(Tag))).all()) == 2
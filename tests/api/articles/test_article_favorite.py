@@ -3,7 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.models.article import article_favorite
+from app.models.article import Article, article_favorite
 from tests.conftest import acting_as_john, create_jane_user, generate_article
 
 
@@ -42,6 +42,7 @@ async def test_can_unfavorite_article(client: TestClient, db: AsyncSession) -> N
 
     db_obj = generate_article(jane)
     db_obj.favorited_by.append(john)
+    db_obj.favorites_count = 1
     db.add(db_obj)
     await db.commit()
 
@@ -54,3 +55,20 @@ async def test_can_unfavorite_article(client: TestClient, db: AsyncSession) -> N
         "favoritesCount": 0,
     }.items() <= r.json()["article"].items()
     assert await db.scalar(select(article_favorite)) is None
+
+
+async def test_favorite_article_twice_counts_once(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+
+    db_obj = generate_article(john)
+    db.add(db_obj)
+    await db.commit()
+
+    updated_at = client.get("/api/articles/test-title").json()["article"]["updatedAt"]
+
+    client.post("/api/articles/test-title/favorite")
+    r = client.post("/api/articles/test-title/favorite")
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["article"]["favoritesCount"] == 1
+    assert client.get("/api/articles/test-title").json()["article"]["updatedAt"] == updated_at
+    assert await db.scalar(select(Article.favorites_count)) == 1
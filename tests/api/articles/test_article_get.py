@@ -1,8 +1,11 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from tests.conftest import acting_as_john, generate_article
+from app.core.cache import article_dto_cache
+from app.models.article import Article
+from tests.conftest import acting_as_john, create_jane_user, generate_article
 
 
 def test_cannot_get_non_existent_article(client: TestClient) -> None:
@@ -33,3 +36,55 @@ async def test_can_get_article(client: TestClient, db: AsyncSession) -> None:
         "favorited": False,
         "favoritesCount": 0,
     }.items() <= r.json()["article"].items()
+
+
+async def test_article_dto_is_shared_until_article_or_author_updated(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+
+    db_obj = generate_article(john)
+    db.add(db_obj)
+    await db.commit()
+
+    client.get("/api/articles/test-title")
+    r = client.get("/api/articles")
+    assert article_dto_cache.hits == 1
+    assert r.json()["articles"][0]["title"] == "Test Title"
+
+    client.post("/api/articles/test-title/favorite")
+    r = client.get("/api/articles/test-title")
+    assert article_dto_cache.hits == 3
+    assert {"favorited": True, "favoritesCount": 1}.items() <= r.json()["article"].items()
+
+    client.put("/api/articles/test-title", json={"article": {"title": "New Title"}})
+    client.put("/api/user", json={"user": {"bio": "New Bio"}})
+
+    hits = article_dto_cache.hits
+    r = client.get("/api/articles")
+    assert article_dto_cache.hits == hits
+    assert r.json()["articles"][0]["title"] == "New Title"
+    assert r.json()["articles"][0]["author"]["bio"] == "New Bio"
+
+
+async def test_article_is_read_for_viewer_in_one_statement(
+    client: TestClient, db: AsyncSession, statements: list[str]
+) -> None:
+    john = await acting_as_john(db, client)
+    jane = await create_jane_user(db)
+
+    db_obj = generate_article(jane)
+    db_obj.favorited_by = [john, jane]
+    db.add(db_obj)
+    jane.followers.append(john)
+    await db.commit()
+    await db.execute(update(Article).values(favorites_count=2))
+    await db.commit()
+
+    statements.clear()
+    r = client.get("/api/articles/test-title")
+
+    assert {"favorited": True, "favoritesCount": 2}.items() <= r.json()["article"].items()
+    assert r.json()["article"]["author"]["following"]
+    # Favorited and following are EXISTS columns, neither collection is loaded
+    (statement,) = [statement for statement in statements if "FROM articles" in statement]
+    assert "EXISTS" in statement
+    assert "follower_user_1" not in statement
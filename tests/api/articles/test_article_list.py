@@ -1,11 +1,17 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.models.article import Article
+from app.core.cache import article_dto_cache
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.crud.crud_article import ArticlesRepository
+from app.models.article import Article, feed_timeline
 from app.models.tag import Tag
-from app.models.user import User
-from tests.conftest import acting_as_user, create_jane_user, create_john_user
+from app.models.user import User, follower_user
+from tests.conftest import acting_as_user, create_jane_user, create_john_user, generate_article
 
 
 async def generate_articles(db: AsyncSession) -> User:
@@ -54,6 +60,7 @@ async def generate_articles(db: AsyncSession) -> User:
 
         if article.slug in john_favorited_articles:
             article.favorited_by.append(john)
+            article.favorites_count = 1
 
         db.add(article)
 
@@ -192,3 +199,410 @@ async def test_can_paginate_feed(client: TestClient, db: AsyncSession) -> None:
         "favorited": False,
         "favoritesCount": 0,
     }.items() <= r.json()["articles"][0].items()
+
+
+async def test_can_paginate_articles_with_cursor(client: TestClient, db: AsyncSession) -> None:
+    await generate_articles(db)
+
+    r = client.get("/api/articles?limit=10")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articles"][0]["slug"] == "jane-article-20"
+    assert r.json()["nextCursor"] is not None
+
+    r = client.get(f"/api/articles?limit=10&cursor={r.json()['nextCursor']}")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articles"][0]["slug"] == "jane-article-10"
+
+    r = client.get(f"/api/articles?limit=10&cursor={r.json()['nextCursor']}")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert len(r.json()["articles"]) == 10
+    assert r.json()["articlesCount"] == 50
+    assert r.json()["articles"][0]["slug"] == "john-article-30"
+
+
+async def test_can_paginate_filtered_articles_with_cursor_until_last_page(client: TestClient, db: AsyncSession) -> None:
+    await generate_articles(db)
+
+    r = client.get("/api/articles?limit=20&tag=jane")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert len(r.json()["articles"]) == 20
+
+    r = client.get(f"/api/articles?limit=20&tag=jane&cursor={r.json()['nextCursor']}")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articles"] == []
+    assert r.json()["nextCursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["invalid", encode_cursor(True)])
+def test_cannot_paginate_articles_with_invalid_cursor(client: TestClient, cursor: str) -> None:
+    r = client.get(f"/api/articles?cursor={cursor}")
+    assert r.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_can_paginate_feed_with_cursor(client: TestClient, db: AsyncSession) -> None:
+    john = await generate_articles(db)
+    acting_as_user(john, client)
+
+    r = client.get("/api/articles/feed?limit=15")
+    assert r.status_code == status.HTTP_200_OK
+
+    r = client.get(f"/api/articles/feed?limit=15&cursor={r.json()['nextCursor']}")
+    assert r.status_code == status.HTTP_200_OK
+    assert len(r.json()["articles"]) == 5
+    assert r.json()["articlesCount"] == 20
+    assert r.json()["articles"][0]["slug"] == "jane-article-5"
+    assert r.json()["nextCursor"] is None
+
+
+async def test_list_articles_does_not_multiply_rows_with_favorites(client: TestClient, db: AsyncSession) -> None:
+    john = await create_john_user(db)
+    jane = await create_jane_user(db)
+
+    article = Article(
+        title="Popular Article",
+        description="Test Description",
+        body="Test Body",
+        slug="popular-article",
+        author=john,
+    )
+    article.tags.append(Tag(name="Tag B"))
+    article.tags.append(Tag(name="Tag A"))
+    article.favorited_by.append(john)
+    article.favorited_by.append(jane)
+    article.favorites_count = 2
+    db.add(article)
+    await db.commit()
+    await db.refresh(jane)
+
+    acting_as_user(jane, client)
+    r = client.get("/api/articles")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articlesCount"] == 1
+    assert len(r.json()["articles"]) == 1
+    assert {
+        "slug": "popular-article",
+        "tagList": ["Tag A", "Tag B"],
+        "favorited": True,
+        "favoritesCount": 2,
+    }.items() <= r.json()["articles"][0].items()
+
+
+async def test_list_and_created_articles_order_tags_alike(client: TestClient, db: AsyncSession) -> None:
+    john = await create_john_user(db)
+    acting_as_user(john, client)
+
+    tags = ["b", "B", "a", "A", "é"]
+    r = client.post(
+        "/api/articles",
+        json={"article": {"title": "Test Title", "description": "Test", "body": "Test", "tagList": tags}},
+    )
+    assert r.json()["article"]["tagList"] == sorted(tags)
+
+    article_dto_cache.clear()
+
+    assert client.get("/api/articles").json()["articles"][0]["tagList"] == sorted(tags)
+
+
+async def test_can_serve_cached_articles_count_until_invalidated(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ARTICLES_COUNT_STRATEGY", "cached")
+    john = await generate_articles(db)
+
+    r = client.get("/api/articles?limit=10")
+    assert r.json()["articlesCount"] == 50
+
+    db.add(generate_article(john, "uncounted-article"))
+    await db.commit()
+    await db.refresh(john)
+
+    r = client.get("/api/articles?limit=10")
+    assert r.json()["articlesCount"] == 50
+
+    acting_as_user(john, client)
+    r = client.post(
+        "/api/articles",
+        json={
+            "article": {
+                "title": "New Article",
+                "description": "Test Description",
+                "body": "Test Body",
+                "tagList": [],
+            }
+        },
+    )
+    assert r.status_code == status.HTTP_200_OK
+
+    r = client.get("/api/articles?limit=10")
+    assert r.json()["articlesCount"] == 52
+
+
+@pytest.mark.parametrize("count_query", ["parallel", "single"])
+async def test_can_estimate_articles_count_with_exact_filters(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch, count_query: str
+) -> None:
+    monkeypatch.setattr(settings, "ARTICLES_COUNT_STRATEGY", "estimated")
+    monkeypatch.setattr(settings, "ARTICLES_COUNT_QUERY", count_query)
+    await generate_articles(db)
+
+    # Estimates below the threshold fall back to exact counts
+    for query, count in (("author=John Doe", 30), ("favorited=John Doe", 5), ("tag=Jane Tag&author=Jane Doe", 20)):
+        r = client.get(f"/api/articles?{query}&exact=true")
+        assert r.status_code == status.HTTP_200_OK, query
+        assert r.json()["articlesCount"] == count
+
+
+async def test_can_skip_articles_count_after_first_page(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ARTICLES_COUNT_FIRST_PAGE_ONLY", True)
+    await generate_articles(db)
+
+    r = client.get("/api/articles?limit=10")
+    assert r.json()["articlesCount"] == 50
+
+    r = client.get("/api/articles?limit=10&offset=10")
+    assert len(r.json()["articles"]) == 10
+    assert r.json()["articlesCount"] is None
+
+
+async def test_can_count_articles_in_list_statement(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch, statements: list[str]
+) -> None:
+    monkeypatch.setattr(settings, "ARTICLES_COUNT_QUERY", "single")
+    await generate_articles(db)
+
+    r = client.get("/api/articles?limit=10&tag=jane")
+    assert len(r.json()["articles"]) == 10
+    assert r.json()["articlesCount"] == 20
+    assert len(statements) == 1
+
+    r = client.get(f"/api/articles?limit=10&tag=jane&cursor={r.json()['nextCursor']}")
+    assert len(r.json()["articles"]) == 10
+    assert r.json()["articlesCount"] == 20
+
+    r = client.get("/api/articles?limit=10&offset=40")
+    assert r.json()["articles"][0]["slug"] == "john-article-10"
+    assert r.json()["articlesCount"] == 50
+
+    r = client.get("/api/articles?limit=10&offset=50")
+    assert r.json()["articles"] == []
+    assert r.json()["articlesCount"] == 50
+
+    r = client.get("/api/articles?tag=unknown")
+    assert r.json()["articlesCount"] == 0
+
+
+async def test_can_paginate_feed_from_timeline(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "FEED_TIMELINE", True)
+    john = await create_john_user(db)
+    jane = await create_jane_user(db)
+
+    db.add(generate_article(jane, "jane-old-article"))
+    await db.commit()
+    await db.refresh(jane)
+
+    acting_as_user(john, client)
+    client.post("/api/profiles/Jane Doe/follow")
+
+    acting_as_user(jane, client)
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "Jane New Article", "description": "Test", "body": "Test", "tagList": []}},
+    )
+
+    acting_as_user(john, client)
+    r = client.get("/api/articles/feed")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articlesCount"] == 2
+    assert [article["slug"] for article in r.json()["articles"]] == ["jane-new-article", "jane-old-article"]
+    assert len((await db.execute(select(feed_timeline))).all()) == 2
+
+    client.delete("/api/profiles/Jane Doe/follow")
+    r = client.get("/api/articles/feed")
+
+    assert r.json()["articlesCount"] == 0
+    assert (await db.execute(select(feed_timeline))).first() is None
+
+
+async def test_can_paginate_feed_merging_timeline_and_authors_with_too_many_followers(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "FEED_TIMELINE", True)
+    john = await create_john_user(db)
+    jane = await create_jane_user(db)
+    bob = User(name="Bob Doe", email="bob.doe@example.com", fanout_on_read=True)
+    db.add(bob)
+    articles = [generate_article(jane if i % 2 == 0 else bob, f"article-{i}") for i in range(12)]
+    db.add_all(articles)
+    await db.flush()
+
+    await db.execute(
+        insert(follower_user).values(
+            [{"follower_id": john.id, "following_id": jane.id}, {"follower_id": john.id, "following_id": bob.id}]
+        )
+    )
+    # Articles of Bob fanned out before he switched to fan-out on read stay in the timeline
+    await db.execute(
+        insert(feed_timeline).values(
+            [{"user_id": john.id, "article_id": article.id} for article in articles if article.author_id == jane.id]
+            + [
+                {"user_id": john.id, "article_id": article.id}
+                for article in articles[:4]
+                if article.author_id == bob.id
+            ]
+        )
+    )
+    await db.commit()
+
+    acting_as_user(john, client)
+
+    r = client.get("/api/articles/feed?limit=5")
+    assert r.json()["articlesCount"] == 12
+    assert [article["slug"] for article in r.json()["articles"]] == [f"article-{i}" for i in range(11, 6, -1)]
+
+    next_page = [f"article-{i}" for i in range(6, 1, -1)]
+    r = client.get(f"/api/articles/feed?limit=5&cursor={r.json()['nextCursor']}")
+    assert [article["slug"] for article in r.json()["articles"]] == next_page
+    assert r.json()["articlesCount"] == 12
+
+    r = client.get("/api/articles/feed?limit=5&offset=5")
+    assert [article["slug"] for article in r.json()["articles"]] == next_page
+
+    r = client.get("/api/articles/feed?limit=5&offset=10")
+    assert [article["slug"] for article in r.json()["articles"]] == ["article-1", "article-0"]
+    assert r.json()["articlesCount"] == 12
+
+
+async def test_unfollow_prunes_timeline_of_author_switched_to_fanout_on_read(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "FEED_TIMELINE", True)
+    john = await create_john_user(db)
+    jane = await create_jane_user(db)
+    jane_id = jane.id
+
+    db.add(generate_article(jane, "jane-old-article"))
+    await db.commit()
+
+    acting_as_user(john, client)
+    client.post("/api/profiles/Jane Doe/follow")
+    assert len((await db.execute(select(feed_timeline))).all()) == 1
+
+    await db.execute(update(User).filter_by(id=jane_id).values(fanout_on_read=True))
+    await db.commit()
+
+    client.delete("/api/profiles/Jane Doe/follow")
+    r = client.get("/api/articles/feed")
+
+    assert r.json()["articles"] == []
+    assert (await db.execute(select(feed_timeline))).first() is None
+
+
+async def test_can_merge_feed_of_authors_with_too_many_followers(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "FEED_TIMELINE", True)
+    monkeypatch.setattr(settings, "FEED_FANOUT_MAX_FOLLOWERS", 0)
+    john = await create_john_user(db)
+    jane = await create_jane_user(db)
+
+    acting_as_user(john, client)
+    client.post("/api/profiles/Jane Doe/follow")
+
+    updated_at = await db.scalar(select(User.updated_at).filter_by(id=jane.id))
+
+    acting_as_user(jane, client)
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "Jane New Article", "description": "Test", "body": "Test", "tagList": []}},
+    )
+
+    acting_as_user(john, client)
+    r = client.get("/api/articles/feed")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert [article["slug"] for article in r.json()["articles"]] == ["jane-new-article"]
+    assert (await db.execute(select(feed_timeline))).first() is None
+    assert await db.scalar(select(User.fanout_on_read).filter_by(id=jane.id)) is True
+    # Switching to fan-out on read leaves cached articles of the author valid
+    assert await db.scalar(select(User.updated_at).filter_by(id=jane.id)) == updated_at
+
+
+async def test_can_filter_articles_with_exact_match(client: TestClient, db: AsyncSession) -> None:
+    john = await generate_articles(db)
+    acting_as_user(john, client)
+
+    r = client.get("/api/articles?limit=10&author=John Doe&exact=true")
+    assert r.json()["articlesCount"] == 30
+
+    r = client.get("/api/articles?limit=10&tag=Jane Tag&favorited=John Doe&exact=true")
+    assert r.json()["articlesCount"] == 5
+    assert r.json()["articles"][0]["slug"] == "jane-article-16"
+
+    r = client.get("/api/articles?limit=10&author=john&exact=true")
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articles"] == []
+    assert r.json()["articlesCount"] == 0
+
+
+async def test_can_filter_articles_with_exact_match_by_default(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ARTICLES_FILTER_MODE", "exact")
+    await generate_articles(db)
+
+    r = client.get("/api/articles?limit=10&tag=jane")
+    assert r.json()["articlesCount"] == 0
+
+    r = client.get("/api/articles?limit=10&tag=jane&exact=false")
+    assert r.json()["articlesCount"] == 20
+
+
+async def test_can_list_articles_with_sparse_fieldset(client: TestClient, db: AsyncSession) -> None:
+    john = await generate_articles(db)
+    acting_as_user(john, client)
+
+    r = client.get("/api/articles?limit=10&tag=Jane Tag&favorited=John Doe&exact=true&fields=title, tagList,favorited")
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articlesCount"] == 5
+    assert r.json()["articles"][0] == {
+        "title": "Jane Article 16",
+        "slug": "jane-article-16",
+        "tagList": ["Jane Tag", "Tag 1", "Tag 2"],
+        "favorited": True,
+    }
+
+    r = client.get("/api/articles/feed?limit=10&fields=author")
+    assert r.json()["articles"][0] == {
+        "slug": "jane-article-20",
+        "author": {
+            "username": "Jane Doe",
+            "bio": "Jane Bio",
+            "image": "https://randomuser.me/api/portraits/women/1.jpg",
+            "following": True,
+        },
+    }
+
+
+async def test_sparse_fieldset_does_not_load_omitted_columns(db: AsyncSession) -> None:
+    query = str(ArticlesRepository(db, db)._list_query(None, {"slug", "title"}))
+
+    assert "articles.title" in query
+    assert "articles.body" not in query
+    assert "articles.description" not in query
+    assert "array_agg" not in query
+
+
+def test_cannot_list_articles_with_unknown_fields(client: TestClient) -> None:
+    r = client.get("/api/articles?fields=title,password")
+    assert r.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,89 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.models.article import Article
+from tests.conftest import create_john_user
+
+
+async def generate_articles(db: AsyncSession) -> None:
+    john = await create_john_user(db)
+
+    db.add(
+        Article(
+            title="Cooking pasta",
+            description="How to cook pasta",
+            body="Boil water, add salt.",
+            slug="cooking-pasta",
+            author=john,
+        )
+    )
+    db.add(
+        Article(
+            title="Travel notes",
+            description="Rome in spring",
+            body="We ate a lot of pasta.",
+            slug="travel-notes",
+            author=john,
+        )
+    )
+    db.add(
+        Article(
+            title="Gardening",
+            description="Growing tomatoes",
+            body="Water every morning.",
+            slug="gardening",
+            author=john,
+        )
+    )
+
+    await db.commit()
+    await db.close()
+
+
+def test_cannot_search_articles_without_terms(client: TestClient) -> None:
+    r = client.get("/api/articles/search?q=")
+    assert r.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+async def test_can_search_articles_by_relevance(client: TestClient, db: AsyncSession) -> None:
+    await generate_articles(db)
+
+    r = client.get("/api/articles/search?q=pasta")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articlesCount"] == 2
+    assert [article["slug"] for article in r.json()["articles"]] == ["cooking-pasta", "travel-notes"]
+    assert {
+        "title": "Cooking pasta",
+        "description": "How to cook pasta",
+        "body": "Boil water, add salt.",
+        "author": {
+            "username": "John Doe",
+            "bio": "John Bio",
+            "image": "https://randomuser.me/api/portraits/men/1.jpg",
+            "following": False,
+        },
+        "tagList": [],
+        "favorited": False,
+        "favoritesCount": 0,
+    }.items() <= r.json()["articles"][0].items()
+
+
+async def test_can_paginate_search_with_cursor(client: TestClient, db: AsyncSession) -> None:
+    await generate_articles(db)
+
+    r = client.get("/api/articles/search?q=pasta OR water&limit=2")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["articlesCount"] == 3
+    assert len(r.json()["articles"]) == 2
+
+    slugs = [article["slug"] for article in r.json()["articles"]]
+
+    r = client.get(f"/api/articles/search?q=pasta OR water&limit=2&cursor={r.json()['nextCursor']}")
+
+    assert r.status_code == status.HTTP_200_OK
+    assert len(r.json()["articles"]) == 1
+    assert r.json()["articles"][0]["slug"] not in slugs
+    assert r.json()["nextCursor"] is None
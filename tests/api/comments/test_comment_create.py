@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.models.article import Article
 from app.models.comment import Comment
 from tests.conftest import acting_as_john, generate_article
 
@@ -51,3 +52,4 @@ async def test_can_create_comment(client: TestClient, db: AsyncSession) -> None:
     assert r.status_code == status.HTTP_200_OK
     assert r.json()["comment"]["body"] == "Test Comment"
     assert await db.scalar(select(Comment).filter_by(body="Test Comment")) is not None
+    assert await db.scalar(select(Article.comments_count)) == 1
@@ -92,6 +92,7 @@ async def test_can_delete_own_comment(client: TestClient, db: AsyncSession) -> N
     db_obj = generate_article(jane)
     comment = Comment(body="Test Comment", author=john)
     db_obj.comments.append(comment)
+    db_obj.comments_count = 1
     db.add(db_obj)
     await db.commit()
     await db.refresh(comment)
@@ -99,3 +100,4 @@ async def test_can_delete_own_comment(client: TestClient, db: AsyncSession) -> N
     r = client.delete(f"/api/articles/test-title/comments/{comment.id}")
     assert r.status_code == status.HTTP_200_OK
     assert await db.scalar(select(Comment)) is None
+    assert await db.scalar(select(Article.comments_count)) == 0
@@ -1,9 +1,13 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.core.pagination import encode_cursor
 from app.models.comment import Comment
-from tests.conftest import create_john_user, generate_article
+from app.models.user import follower_user
+from tests.conftest import acting_as_jane, create_john_user, generate_article
 
 
 def test_cannot_list_all_comments_of_non_existent_article(client: TestClient) -> None:
@@ -32,3 +36,71 @@ async def test_can_list_all_comments_of_article(client: TestClient, db: AsyncSes
             "following": False,
         },
     }.items() <= r.json()["comments"][0].items()
+    assert r.json()["nextCursor"] is None
+
+
+async def test_can_paginate_comments_of_article_with_cursor(client: TestClient, db: AsyncSession) -> None:
+    john = await create_john_user(db)
+
+    db_obj = generate_article(john)
+    for i in range(1, 6):
+        db_obj.comments.append(Comment(body=f"Comment {i}", author=john))
+    db.add(db_obj)
+    await db.commit()
+
+    bodies = []
+    url = "/api/articles/test-title/comments?limit=2"
+    while True:
+        r = client.get(url)
+        assert r.status_code == status.HTTP_200_OK
+        assert len(r.json()["comments"]) <= 2
+        bodies += [comment["body"] for comment in r.json()["comments"]]
+
+        if r.json()["nextCursor"] is None:
+            break
+        url = f"/api/articles/test-title/comments?limit=2&cursor={r.json()['nextCursor']}"
+
+    assert bodies == [f"Comment {i}" for i in range(5, 0, -1)]
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+async def test_cannot_list_comments_with_invalid_limit(client: TestClient, db: AsyncSession, limit: int) -> None:
+    john = await create_john_user(db)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.get(f"/api/articles/test-title/comments?limit={limit}")
+    assert r.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+@pytest.mark.parametrize("cursor", ["invalid", encode_cursor(True)])
+async def test_cannot_list_comments_with_invalid_cursor(client: TestClient, db: AsyncSession, cursor: str) -> None:
+    john = await create_john_user(db)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.get(f"/api/articles/test-title/comments?cursor={cursor}")
+    assert r.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_following_of_comment_authors_is_read_once_per_page(
+    client: TestClient, db: AsyncSession, statements: list[str]
+) -> None:
+    john = await create_john_user(db)
+    jane = await acting_as_jane(db, client)
+
+    db_obj = generate_article(john)
+    for i in range(1, 6):
+        db_obj.comments.append(Comment(body=f"Comment {i}", author=john))
+    db_obj.comments.append(Comment(body="Comment 6", author=jane))
+    db.add(db_obj)
+    await db.execute(insert(follower_user).values(follower_id=jane.id, following_id=john.id))
+    await db.commit()
+
+    statements.clear()
+    r = client.get("/api/articles/test-title/comments")
+    assert r.status_code == status.HTTP_200_OK
+    assert [comment["author"]["following"] for comment in r.json()["comments"]] == [False] + [True] * 5
+
+    # Current user, article, comments and follow state of their authors
+    assert len(statements) == 4
@@ -3,7 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.models.user import follower_user
+from app.models.user import User, follower_user
 from tests.conftest import (
     acting_as_jane,
     acting_as_user,
@@ -43,6 +43,8 @@ async def test_can_follow_profile(client: TestClient, db: AsyncSession) -> None:
     }
 
     assert (await db.scalar(select(follower_user))) is not None
+    assert (await db.scalar(select(User.followers_count).filter_by(name="John Doe"))) == 1
+    assert (await db.scalar(select(User.following_count).filter_by(name="Jane Doe"))) == 1
 
 
 async def test_can_unfollow_profile(client: TestClient, db: AsyncSession) -> None:
@@ -52,6 +54,8 @@ async def test_can_unfollow_profile(client: TestClient, db: AsyncSession) -> Non
     acting_as_user(jane, client)
 
     john.followers.append(jane)
+    john.followers_count = 1
+    jane.following_count = 1
     await db.merge(john)
     await db.commit()
 
@@ -66,3 +70,5 @@ async def test_can_unfollow_profile(client: TestClient, db: AsyncSession) -> Non
     }
 
     assert (await db.scalar(select(follower_user))) is None
+    assert (await db.scalar(select(User.followers_count).filter_by(name="John Doe"))) == 0
+    assert (await db.scalar(select(User.following_count).filter_by(name="Jane Doe"))) == 0
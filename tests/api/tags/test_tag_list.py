@@ -1,8 +1,14 @@
+from typing import Any
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.core.cache import tags_cache
+from app.core.config import settings
 from app.models.tag import Tag
+from tests.conftest import acting_as_john
 
 
 async def test_can_list_all_tags(client: TestClient, db: AsyncSession) -> None:
@@ -19,3 +25,83 @@ async def test_can_list_all_tags(client: TestClient, db: AsyncSession) -> None:
         "Tag 2",
         "Tag 3",
     ]
+
+
+async def test_tags_are_not_cached_by_default(client: TestClient, db: AsyncSession) -> None:
+    assert client.get("/api/tags").json()["tags"] == []
+
+    db.add(Tag(name="Tag 1"))
+    await db.commit()
+
+    assert client.get("/api/tags").json()["tags"] == ["Tag 1"]
+
+
+async def test_tags_are_served_from_snapshot_until_new_tag(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TAGS_CACHE", True)
+    await acting_as_john(db, client)
+    db.add(Tag(name="Tag 1"))
+    await db.commit()
+
+    r = client.get("/api/tags")
+    etag = r.headers["etag"]
+    assert r.json()["tags"] == ["Tag 1"]
+    assert "cache-control" not in r.headers
+
+    r = client.get("/api/tags", headers={"If-None-Match": etag})
+    assert r.status_code == status.HTTP_304_NOT_MODIFIED
+    assert r.content == b""
+
+    db.add(Tag(name="Tag 0"))
+    await db.commit()
+    assert client.get("/api/tags").json()["tags"] == ["Tag 1"]
+
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "Test Title", "description": "Test", "body": "Test", "tagList": ["Tag 2"]}},
+    )
+
+    r = client.get("/api/tags", headers={"If-None-Match": etag})
+    assert r.status_code == status.HTTP_200_OK
+    assert r.headers["etag"] != etag
+    assert r.json()["tags"] == ["Tag 0", "Tag 1", "Tag 2"]
+
+
+async def test_tags_can_be_cached_by_clients(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TAGS_MAX_AGE", 60)
+
+    r = client.get("/api/tags")
+    assert r.headers["cache-control"] == "public, max-age=60"
+
+
+async def test_tags_snapshot_is_reloaded_from_primary_after_new_tag(
+    client: TestClient,
+    db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    primary_checkouts: list[Any],
+    replica_checkouts: list[Any],
+) -> None:
+    monkeypatch.setattr(settings, "TAGS_CACHE", True)
+    await acting_as_john(db, client)
+    primary_checkouts.clear()
+
+    client.get("/api/tags")
+    assert primary_checkouts == []
+
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "Test Title", "description": "Test", "body": "Test", "tagList": ["Tag 1"]}},
+    )
+    primary_checkouts.clear()
+    replica_checkouts.clear()
+
+    assert client.get("/api/tags").json()["tags"] == ["Tag 1"]
+    assert len(primary_checkouts) == 1
+    assert replica_checkouts == []
+
+    tags_cache.clear()
+    client.get("/api/tags")
+    assert len(primary_checkouts) == 1
@@ -0,0 +1,54 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tests.conftest import acting_as_john, generate_article
+
+READ_URLS = (
+    "/api/user",
+    "/api/articles",
+    "/api/articles/feed",
+    "/api/articles/search?q=test",
+    "/api/articles/test-title",
+    "/api/articles/test-title/comments",
+    "/api/profiles/John Doe",
+    "/api/tags",
+)
+
+
+@pytest.mark.parametrize("authenticated", [True, False])
+async def test_read_routes_never_check_out_primary(
+    client: TestClient,
+    db: AsyncSession,
+    primary_checkouts: list[Any],
+    replica_checkouts: list[Any],
+    authenticated: bool,
+) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    reader = client if authenticated else TestClient(client.app)
+    for url in READ_URLS:
+        if not authenticated and url in ("/api/user", "/api/articles/feed"):
+            continue
+        r = reader.get(url)
+        assert r.status_code == status.HTTP_200_OK, url
+
+    assert primary_checkouts == []
+    assert replica_checkouts
+
+
+async def test_write_routes_check_out_primary(
+    client: TestClient, db: AsyncSession, primary_checkouts: list[Any]
+) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    client.post("/api/articles/test-title/favorite")
+
+    assert len(primary_checkouts) == 1
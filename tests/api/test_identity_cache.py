@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import follower_user
+from tests.conftest import acting_as_john, create_jane_user, generate_article
+
+
+@pytest.fixture()
+def identity_cache_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "IDENTITY_CACHE", True)
+
+
+async def test_identity_is_loaded_on_every_request_by_default(
+    client: TestClient, db: AsyncSession, statements: list[str]
+) -> None:
+    await acting_as_john(db, client)
+
+    client.get("/api/user")
+    client.get("/api/user")
+    assert len(statements) == 2
+
+
+@pytest.mark.usefixtures("identity_cache_enabled")
+async def test_identity_is_cached_until_user_is_updated(
+    client: TestClient, db: AsyncSession, statements: list[str]
+) -> None:
+    await acting_as_john(db, client)
+
+    assert client.get("/api/user").json()["user"]["bio"] == "John Bio"
+    assert len(statements) == 1
+
+    statements.clear()
+    assert client.get("/api/user").json()["user"]["bio"] == "John Bio"
+    assert len(statements) == 0
+
+    client.put("/api/user", json={"user": {"bio": "New Bio"}})
+
+    statements.clear()
+    assert client.get("/api/user").json()["user"]["bio"] == "New Bio"
+    assert len(statements) == 1
+
+
+@pytest.mark.usefixtures("identity_cache_enabled")
+async def test_cached_identity_sees_its_favorites(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    assert client.get("/api/articles/test-title").json()["article"]["favorited"] is False
+
+    client.post("/api/articles/test-title/favorite")
+
+    assert client.get("/api/articles/test-title").json()["article"]["favorited"] is True
+
+
+async def test_embedded_claims_skip_user_lookup_on_optional_auth(
+    client: TestClient, db: AsyncSession, statements: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "JWT_EMBED_CLAIMS", True)
+
+    jane = await create_jane_user(db)
+    john = await acting_as_john(db, client)
+    john_id = john.id
+    await db.execute(insert(follower_user).values(follower_id=john_id, following_id=jane.id))
+    await db.commit()
+
+    client.headers["Authorization"] = f"Bearer {create_access_token(john_id, username='John Doe')}"
+
+    statements.clear()
+    r = client.get("/api/profiles/Jane Doe")
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["profile"]["following"] is True
+    assert len(statements) == 1
+
+    # Endpoints requiring authentication still load the user
+    statements.clear()
+    assert client.get("/api/user").status_code == status.HTTP_200_OK
+    assert len(statements) == 1
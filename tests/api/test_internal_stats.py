@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from starlette import status
+
+from app.core.config import settings, settingsReadOnly
+from app.db import session
+from app.db.pool import MeasuredQueuePool
+from tests.conftest import acting_as_john
+
+
+def test_internal_stats_are_disabled_by_default(client: TestClient) -> None:
+    r = client.get("/api/internal/stats")
+    assert r.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_can_get_pool_stats(client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "INTERNAL_STATS", True)
+    await acting_as_john(db, client)
+
+    replica = session.replicas.replicas[0]
+    checkouts = replica.pool.stats()["checkouts"]
+
+    client.get("/api/user")
+    r = client.get("/api/internal/stats")
+
+    assert r.status_code == status.HTTP_200_OK
+    stats = r.json()["pools"]["replicas"][replica.name]
+    assert stats["healthy"]
+    assert stats["checkouts"] == checkouts + 1
+    assert stats["checked_out"] == 0
+    assert stats["size"] == settingsReadOnly.DB_RO_POOL_SIZE
+    assert stats["timeouts"] == 0
+    assert stats["wait_time"] >= 0
+    assert r.json()["pools"]["primary"]["checked_out"] == 0
+    assert r.json()["password_hash"]["pending"] == 0
+
+
+async def test_pool_stats_count_timeouts() -> None:
+    engine = create_async_engine(
+        settings.DATABASE_URL.__str__(), poolclass=MeasuredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    pool: MeasuredQueuePool = engine.pool  # type: ignore[assignment]
+
+    async with engine.connect():
+        assert pool.stats()["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect().start()
+
+    await engine.dispose()
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_time"] >= 0.1
@@ -0,0 +1,87 @@
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.core.config import settings
+from app.core.middleware import MIN_LSN_COOKIE
+from app.core.security import verify_lsn
+from app.db import session
+from app.db.replicas import Replica
+from tests.conftest import acting_as_john, generate_article
+
+
+@pytest.fixture()
+def replica(monkeypatch: pytest.MonkeyPatch) -> Replica:
+    # The test database is no standby, the replica is made to lag behind every write
+    replica = session.replicas.replicas[0]
+    monkeypatch.setattr(replica, "standby", True)
+    monkeypatch.setattr(replica, "replay_lsn", 0)
+    return replica
+
+
+async def test_read_your_writes_is_disabled_by_default(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.post("/api/articles/test-title/favorite")
+    assert r.status_code == status.HTTP_200_OK
+    assert MIN_LSN_COOKIE not in r.cookies
+
+
+async def test_reads_after_write_wait_for_replica_to_replay_it(
+    client: TestClient,
+    db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    replica: Replica,
+    primary_checkouts: list[Any],
+) -> None:
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES", True)
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.get("/api/articles/test-title")
+    assert MIN_LSN_COOKIE not in r.cookies
+    assert primary_checkouts == []
+
+    r = client.post("/api/articles/test-title/favorite")
+    write_lsn = verify_lsn(r.cookies[MIN_LSN_COOKIE])
+    assert write_lsn is not None
+    assert write_lsn > 0
+
+    primary_checkouts.clear()
+    r = client.get("/api/articles/test-title")
+    assert r.json()["article"]["favorited"]
+    assert len(primary_checkouts) == 1
+
+    monkeypatch.setattr(replica, "replay_lsn", write_lsn)
+
+    primary_checkouts.clear()
+    r = client.get("/api/articles/test-title")
+    assert r.json()["article"]["favorited"]
+    assert primary_checkouts == []
+
+
+async def test_forged_read_position_is_ignored(
+    client: TestClient,
+    db: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    replica: Replica,
+    primary_checkouts: list[Any],
+) -> None:
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES", True)
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+    primary_checkouts.clear()
+
+    for forged in (str(2**63), f"{2**63}.{'0' * 64}"):
+        client.cookies.set(MIN_LSN_COOKIE, forged)
+        r = client.get("/api/articles/test-title")
+        assert r.status_code == status.HTTP_200_OK
+
+    assert primary_checkouts == []
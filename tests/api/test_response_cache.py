@@ -0,0 +1,160 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.core.config import settings
+from app.main import app
+from tests.conftest import acting_as_john, generate_article
+
+
+@pytest.fixture()
+def response_cache_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "RESPONSE_CACHE", True)
+
+
+async def test_response_cache_is_disabled_by_default(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = TestClient(app).get("/api/articles/test-title")
+    assert r.status_code == status.HTTP_200_OK
+    assert "x-cache" not in r.headers
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_anonymous_article_is_served_from_cache_until_favorited(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    anonymous = TestClient(app)
+
+    r = anonymous.get("/api/articles/test-title")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["article"]["favoritesCount"] == 0
+
+    r = anonymous.get("/api/articles/test-title")
+    assert r.headers["x-cache"] == "HIT"
+    assert r.json()["article"]["favoritesCount"] == 0
+
+    r = client.get("/api/articles/test-title")
+    assert "x-cache" not in r.headers
+
+    client.post("/api/articles/test-title/favorite")
+
+    r = anonymous.get("/api/articles/test-title")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["article"]["favoritesCount"] == 1
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_new_comment_only_invalidates_comments_of_article(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    db.add(generate_article(john, "other-title"))
+    await db.commit()
+
+    anonymous = TestClient(app)
+
+    for url in (
+        "/api/articles/test-title",
+        "/api/articles/test-title/comments",
+        "/api/articles/other-title/comments",
+    ):
+        anonymous.get(url)
+
+    client.post("/api/articles/test-title/comments", json={"comment": {"body": "Test Comment"}})
+
+    r = anonymous.get("/api/articles/test-title/comments")
+    assert r.headers["x-cache"] == "MISS"
+    assert [comment["body"] for comment in r.json()["comments"]] == ["Test Comment"]
+
+    assert anonymous.get("/api/articles/test-title").headers["x-cache"] == "HIT"
+    assert anonymous.get("/api/articles/other-title/comments").headers["x-cache"] == "HIT"
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_profile_update_invalidates_articles_of_author(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    anonymous = TestClient(app)
+
+    anonymous.get("/api/profiles/John Doe")
+    anonymous.get("/api/articles?limit=10")
+
+    client.put("/api/user", json={"user": {"bio": "New Bio"}})
+
+    r = anonymous.get("/api/profiles/John Doe")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["profile"]["bio"] == "New Bio"
+
+    r = anonymous.get("/api/articles?limit=10")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["articles"][0]["author"]["bio"] == "New Bio"
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_new_article_invalidates_lists(client: TestClient, db: AsyncSession) -> None:
+    await acting_as_john(db, client)
+
+    anonymous = TestClient(app)
+
+    assert anonymous.get("/api/articles").json()["articlesCount"] == 0
+
+    client.post(
+        "/api/articles",
+        json={"article": {"title": "Test Title", "description": "Test", "body": "Test", "tagList": []}},
+    )
+
+    r = anonymous.get("/api/articles")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["articlesCount"] == 1
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_compressed_variant_is_served_when_accepted(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_GZIP", True)
+
+    john = await acting_as_john(db, client)
+    body = "Test Body " * 100
+    article = generate_article(john)
+    article.body = body
+    db.add(article)
+    await db.commit()
+
+    anonymous = TestClient(app)
+    anonymous.get("/api/articles/test-title")
+
+    r = anonymous.get("/api/articles/test-title", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["x-cache"] == "HIT"
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json()["article"]["body"] == body
+
+    r = anonymous.get("/api/articles/test-title", headers={"Accept-Encoding": "identity"})
+    assert r.headers["x-cache"] == "HIT"
+    assert "content-encoding" not in r.headers
+    assert r.json()["article"]["body"] == body
+
+
+@pytest.mark.usefixtures("response_cache_enabled")
+async def test_sparse_article_list_is_invalidated_by_article(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    anonymous = TestClient(app)
+
+    assert anonymous.get("/api/articles?fields=favoritesCount").headers["x-cache"] == "MISS"
+    assert anonymous.get("/api/articles?fields=favoritesCount").headers["x-cache"] == "HIT"
+
+    client.post("/api/articles/test-title/favorite")
+
+    r = anonymous.get("/api/articles?fields=favoritesCount")
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["articles"] == [{"slug": "test-title", "favoritesCount": 1}]
@@ -0,0 +1,100 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from tests.conftest import acting_as_john, create_jane_user, generate_article
+
+# Authenticated requests read the current user first, then each write is a single statement,
+# article tags apart
+
+
+async def test_register_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    r = client.post(
+        "/api/users",
+        json={"user": {"email": "john.doe@example.com", "password": "password", "username": "John Doe"}},
+    )
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+
+
+async def test_update_user_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    await acting_as_john(db, client)
+
+    r = client.put("/api/user", json={"user": {"email": "john@example.com", "bio": "New Bio"}})
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
+
+
+async def test_create_article_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    await acting_as_john(db, client)
+
+    r = client.post(
+        "/api/articles",
+        json={"article": {"title": "Test Title", "description": "Test", "body": "Test", "tagList": []}},
+    )
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
+
+    statements.clear()
+    r = client.post(
+        "/api/articles",
+        json={"article": {"title": "Other Title", "description": "Test", "body": "Test", "tagList": ["a", "b"]}},
+    )
+    assert r.status_code == status.HTTP_200_OK
+    assert r.json()["article"]["tagList"] == ["a", "b"]
+    assert len(statements) == 4
+
+
+async def test_update_and_delete_article_round_trips(
+    client: TestClient, db: AsyncSession, statements: list[str]
+) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.put("/api/articles/test-title", json={"article": {"title": "New Title"}})
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
+
+    statements.clear()
+    r = client.delete("/api/articles/test-title")
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
+
+
+async def test_favorite_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    for method in ("post", "delete"):
+        statements.clear()
+        r = client.request(method, "/api/articles/test-title/favorite")
+        assert r.status_code == status.HTTP_200_OK
+        assert len(statements) == 2
+
+
+async def test_follow_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    await create_jane_user(db)
+    await acting_as_john(db, client)
+
+    for method in ("post", "delete"):
+        statements.clear()
+        r = client.request(method, "/api/profiles/Jane Doe/follow")
+        assert r.status_code == status.HTTP_200_OK
+        assert len(statements) == 2
+
+
+async def test_comment_round_trips(client: TestClient, db: AsyncSession, statements: list[str]) -> None:
+    john = await acting_as_john(db, client)
+    db.add(generate_article(john))
+    await db.commit()
+
+    r = client.post("/api/articles/test-title/comments", json={"comment": {"body": "Test Comment"}})
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
+
+    statements.clear()
+    r = client.delete(f"/api/articles/test-title/comments/{r.json()['comment']['id']}")
+    assert r.status_code == status.HTTP_200_OK
+    assert len(statements) == 2
@@ -1,7 +1,13 @@
+import time
+from datetime import UTC, datetime, timedelta
+
 from fastapi.testclient import TestClient
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.core.config import settings
+from app.core.security import ALGORITHM, decode_access_token
 from tests.conftest import acting_as_john
 
 
@@ -21,3 +27,27 @@ async def test_user_can_fetch_infos(client: TestClient, db: AsyncSession) -> Non
         "username": "John Doe",
         "email": "john.doe@example.com",
     }.items() <= r.json()["user"].items()
+
+
+async def test_fresh_token_of_user_is_returned_as_is(client: TestClient, db: AsyncSession) -> None:
+    await acting_as_john(db, client)
+
+    r = client.get("/api/user")
+
+    assert r.json()["user"]["token"] == client.headers["Authorization"].removeprefix("Bearer ")
+
+
+async def test_token_near_expiry_is_renewed(client: TestClient, db: AsyncSession) -> None:
+    john = await acting_as_john(db, client)
+    token = jwt.encode(
+        {"exp": datetime.now(UTC) + timedelta(minutes=5), "sub": str(john.id)},
+        settings.JWT_SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+    client.headers["Authorization"] = f"Bearer {token}"
+
+    r = client.get("/api/user")
+
+    renewed = r.json()["user"]["token"]
+    assert renewed != token
+    assert decode_access_token(renewed)["exp"] > time.time() + settings.JWT_REFRESH_WINDOW * 60
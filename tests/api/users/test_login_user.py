@@ -1,9 +1,15 @@
+import asyncio
+from collections.abc import Generator
+
+import bcrypt
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.core.security import decode_access_token, get_password_hash
+from app.core.config import settings
+from app.core.security import bcrypt_rounds, decode_access_token, get_password_hash, password_pool, password_rounds
 from app.models.user import User
 from tests.conftest import create_john_user
 
@@ -30,6 +36,8 @@ async def test_cannot_register_with_invalid_data(client: TestClient, db: AsyncSe
 
 
 async def test_can_login(client: TestClient, db: AsyncSession) -> None:
+    completed = password_pool.completed
+
     db_obj = User(
         name="John Doe",
         email="john.doe@example.com",
@@ -57,3 +65,85 @@ async def test_can_login(client: TestClient, db: AsyncSession) -> None:
 
     payload = decode_access_token(r.json()["user"]["token"])
     assert int(payload["sub"]) == db_obj.id
+
+    # Password checked by the pool, off the event loop
+    assert password_pool.completed == completed + 1
+
+
+async def test_login_is_rejected_when_password_pool_is_busy(
+    client: TestClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+
+    db.add(User(name="John Doe", email="john.doe@example.com", password=get_password_hash("password")))
+    await db.commit()
+
+    r = client.post("/api/users/login", json={"user": {"email": "john.doe@example.com", "password": "password"}})
+
+    assert r.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert r.headers["retry-after"] == "1"
+
+
+@pytest.fixture()
+def password_rounds_5(monkeypatch: pytest.MonkeyPatch) -> Generator[None]:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+    password_rounds.cache_clear()
+    yield
+    password_rounds.cache_clear()
+
+
+def test_password_cost_is_calibrated_on_startup(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PASSWORD_HASH_BUDGET_MS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MIN_ROUNDS", 4)
+    password_rounds.cache_clear()
+
+    with TestClient(client.app):
+        assert password_rounds.cache_info().currsize == 1
+
+    password_rounds.cache_clear()
+
+
+@pytest.mark.usefixtures("password_rounds_5")
+async def test_password_is_rehashed_with_current_cost_on_login(client: TestClient, db: AsyncSession) -> None:
+    db.add(
+        User(
+            name="John Doe",
+            email="john.doe@example.com",
+            password=bcrypt.hashpw(b"password", bcrypt.gensalt(4)).decode("utf-8"),
+        )
+    )
+    await db.commit()
+
+    for _ in range(2):
+        r = client.post("/api/users/login", json={"user": {"email": "john.doe@example.com", "password": "password"}})
+        assert r.status_code == status.HTTP_200_OK
+
+        password = await db.scalar(select(User.password))
+        assert password is not None
+        assert bcrypt_rounds(password) == 5
+
+
+@pytest.mark.usefixtures("password_rounds_5")
+async def test_password_with_higher_cost_is_kept_on_login(client: TestClient, db: AsyncSession) -> None:
+    hashed = bcrypt.hashpw(b"password", bcrypt.gensalt(6)).decode("utf-8")
+    db.add(User(name="John Doe", email="john.doe@example.com", password=hashed))
+    await db.commit()
+
+    r = client.post("/api/users/login", json={"user": {"email": "john.doe@example.com", "password": "password"}})
+    assert r.status_code == status.HTTP_200_OK
+
+    assert await db.scalar(select(User.password)) == hashed
+
+
+async def test_tokens_issued_to_user_are_reused(client: TestClient, db: AsyncSession) -> None:
+    db.add(User(name="John Doe", email="john.doe@example.com", password=get_password_hash("password")))
+    await db.commit()
+
+    tokens = []
+    for _ in range(2):
+        r = client.post("/api/users/login", json={"user": {"email": "john.doe@example.com", "password": "password"}})
+        tokens.append(r.json()["user"]["token"])
+        # Tokens minted a second apart would differ by their expiry
+        await asyncio.sleep(1)
+
+    assert tokens[0] == tokens[1]
@@ -1,22 +1,32 @@
 import asyncio
 import os
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import delete
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-
-from app.models.comment import Comment
-from app.models.tag import Tag
+from sqlalchemy import delete, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 os.environ["PYTHON_ENVIRONNEMENT"] = "testing"
 
+from app.core.cache import (
+    article_dto_cache,
+    articles_count_cache,
+    identity_cache,
+    issued_token_cache,
+    response_cache,
+    tags_cache,
+    token_cache,
+)
 from app.core.config import settings
 from app.core.security import create_access_token
+from app.db import session
 from app.db.base_class import Base
 from app.main import app
 from app.models.article import Article
+from app.models.comment import Comment
+from app.models.tag import Tag
 from app.models.user import User
 
 engine = create_async_engine(settings.DATABASE_URL.__str__(), pool_pre_ping=True)
@@ -25,6 +35,7 @@ TestingSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind
 
 async def init_db() -> None:
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -101,3 +112,54 @@ def generate_article(author: User, slug: str = "test-title") -> Article:
         slug=slug,
         author=author,
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    article_dto_cache.clear()
+    articles_count_cache.clear()
+    response_cache.clear()
+    tags_cache.clear()
+    token_cache.clear()
+    identity_cache.clear()
+    issued_token_cache.clear()
+
+
+@pytest.fixture()
+def statements() -> Generator[list[str]]:
+    # SQL statements sent by the application, each one is a round trip to the database
+    executed: list[str] = []
+
+    def before_cursor_execute(*args: Any) -> None:
+        executed.append(args[2])
+
+    for engine in (session.engine, *session.replicas.engines):
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    yield executed
+
+    for engine in (session.engine, *session.replicas.engines):
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _count_checkouts(*engines: AsyncEngine) -> Generator[list[Any]]:
+    checkouts: list[Any] = []
+
+    def checkout(*args: Any) -> None:
+        checkouts.append(args[0])
+
+    for engine in engines:
+        event.listen(engine.sync_engine, "checkout", checkout)
+    yield checkouts
+    for engine in engines:
+        event.remove(engine.sync_engine, "checkout", checkout)
+
+
+@pytest.fixture()
+def primary_checkouts() -> Generator[list[Any]]:
+    yield from _count_checkouts(session.engine)
+
+
+@pytest.fixture()
+def replica_checkouts() -> Generator[list[Any]]:
+    yield from _count_checkouts(*session.replicas.engines)
@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import SettingsReadOnly, settings
+from app.db.pool import MeasuredQueuePool
+from app.db.replicas import Replica, ReplicaSession, ReplicaSet
+
+
+def _engine(url: str = settings.DATABASE_URL.__str__()) -> AsyncEngine:
+    return create_async_engine(url, poolclass=MeasuredQueuePool)
+
+
+@pytest.fixture()
+async def primary() -> AsyncGenerator[AsyncEngine]:
+    engine = _engine()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def replicas(primary: AsyncEngine) -> AsyncGenerator[ReplicaSet]:
+    replica_set = ReplicaSet([Replica(_engine(), weight=2), Replica(_engine())], primary=primary)
+    yield replica_set
+    for engine in replica_set.engines:
+        await engine.dispose()
+
+
+def test_can_balance_replicas_by_weight(replicas: ReplicaSet) -> None:
+    first, second = replicas.engines
+
+    assert [replicas.choose() for _ in range(6)] == [first, second, first] * 2
+
+
+def test_replica_weights_must_be_positive() -> None:
+    with pytest.raises(ValidationError):
+        SettingsReadOnly(DB_RO_WEIGHTS=[2, 0])
+
+
+def test_can_fall_back_to_primary_without_healthy_replica(replicas: ReplicaSet, primary: AsyncEngine) -> None:
+    first, second = replicas.replicas
+
+    first.healthy = False
+    assert {replicas.choose() for _ in range(3)} == {second.engine}
+
+    second.healthy = False
+    assert replicas.choose() is primary
+
+
+async def test_can_balance_replicas_by_least_outstanding(replicas: ReplicaSet) -> None:
+    replicas.balancing = "least_outstanding"
+    replicas.replicas[0].weight = 1
+    first, second = replicas.engines
+
+    async with first.connect():
+        assert replicas.choose() is second
+
+    async with second.connect():
+        assert replicas.choose() is first
+
+
+async def test_can_eject_and_restore_replicas_from_health_probe(primary: AsyncEngine) -> None:
+    unreachable = _engine(settings.DATABASE_URL.__str__().replace(f":{settings.DB_PORT}/", ":1/"))
+    replicas = ReplicaSet([Replica(_engine()), Replica(unreachable)], primary=primary, health_timeout=1)
+    healthy, failing = replicas.replicas
+
+    healthy.healthy = False
+    await replicas.check_health()
+
+    assert healthy.healthy
+    assert not failing.healthy
+    assert {replicas.choose() for _ in range(3)} == {healthy.engine}
+
+    for engine in replicas.engines:
+        await engine.dispose()
+
+
+async def test_health_probe_does_not_wait_for_exhausted_pool(primary: AsyncEngine) -> None:
+    engine = create_async_engine(
+        settings.DATABASE_URL.__str__(), poolclass=MeasuredQueuePool, pool_size=1, max_overflow=0
+    )
+    replicas = ReplicaSet([Replica(engine)], primary=primary, health_timeout=1)
+
+    async with engine.connect():
+        await replicas.check_health()
+
+    assert replicas.replicas[0].healthy
+
+    await engine.dispose()
+
+
+async def test_health_checks_keep_running_after_unexpected_error(
+    replicas: ReplicaSet, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = 0
+
+    async def check_health() -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError()
+
+    monkeypatch.setattr(replicas, "check_health", check_health)
+    replicas.health_interval = 0
+
+    health_checks = asyncio.create_task(replicas.run_health_checks())
+    await asyncio.sleep(0.1)
+    health_checks.cancel()
+
+    assert calls > 1
+
+
+async def test_replica_session_keeps_its_replica_until_closed(replicas: ReplicaSet) -> None:
+    first, second = replicas.engines
+    session_maker = async_sessionmaker(class_=AsyncSession, sync_session_class=ReplicaSession, replicas=replicas)
+
+    async with session_maker() as db:
+        for _ in range(3):
+            await db.execute(text("SELECT 1"))
+        assert (await db.connection()).engine is first
+
+    async with session_maker() as db:
+        await db.execute(text("SELECT 1"))
+        assert (await db.connection()).engine is second
+
+
+async def test_health_probe_records_replay_position(replicas: ReplicaSet, primary: AsyncEngine) -> None:
+    first, second = replicas.replicas
+
+    await replicas.check_health()
+
+    # The test database is no standby, it has every write
+    assert not first.standby
+    assert first.has_replayed(2**64)
+
+    first.standby = second.standby = True
+    first.replay_lsn, second.replay_lsn = 100, 200
+
+    assert {replicas.choose(min_lsn=150) for _ in range(3)} == {second.engine}
+    assert replicas.choose(min_lsn=250) is primary